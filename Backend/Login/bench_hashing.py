@@ -0,0 +1,40 @@
+# Benchmark: logins/sec for bcrypt verification, inline vs. the dedicated process pool.
+# Usage: python bench_hashing.py [concurrency] [logins]
+import asyncio
+import sys
+import time
+from hashing import BCRYPT_ROUNDS, HASH_POOL_SIZE, hash_password_sync, verify_password, verify_password_sync, shutdown_pool
+
+
+def bench_inline(hashed, logins):
+    start = time.perf_counter()
+    for _ in range(logins):
+        verify_password_sync("benchmark-password", hashed)
+    return logins / (time.perf_counter() - start)
+
+
+async def bench_pool(hashed, logins, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def login():
+        async with semaphore:
+            await verify_password("benchmark-password", hashed)
+
+    await verify_password("benchmark-password", hashed)  # warm up the worker processes
+    start = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(logins)))
+    return logins / (time.perf_counter() - start)
+
+
+def main():
+    concurrency = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    logins = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+    hashed = hash_password_sync("benchmark-password")
+    print(f"bcrypt rounds={BCRYPT_ROUNDS}, pool size={HASH_POOL_SIZE}, concurrency={concurrency}, logins={logins}")
+    print(f"inline (one request thread): {bench_inline(hashed, logins):.1f} logins/sec")
+    print(f"process pool:                {asyncio.run(bench_pool(hashed, logins, concurrency)):.1f} logins/sec")
+    shutdown_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,41 @@
-from sqlalchemy import create_engine, Column, Integer, String
+import os
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
+
+SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./test.db")
+
+# Connection pool settings
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+
+# SQLite pragmas applied to every new connection. WAL lets readers run while a writer commits;
+# override with e.g. SQLITE_PRAGMAS="journal_mode=WAL,synchronous=FULL"
+SQLITE_PRAGMAS = os.getenv(
+    "SQLITE_PRAGMAS", "journal_mode=WAL,synchronous=NORMAL,busy_timeout=5000,cache_size=-20000"
+)
+
+is_sqlite = SQLALCHEMY_DATABASE_URL.startswith("sqlite")
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
 # The `connect_args` parameter is needed only for SQLite.
 engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+    SQLALCHEMY_DATABASE_URL,
+    connect_args={"check_same_thread": False} if is_sqlite else {},
+    poolclass=QueuePool,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_pre_ping=True,
 )
 
+if is_sqlite:
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in filter(None, (p.strip() for p in SQLITE_PRAGMAS.split(","))):
+            cursor.execute(f"PRAGMA {pragma}")
+        cursor.close()
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
@@ -0,0 +1,55 @@
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from passlib.context import CryptContext
+
+# bcrypt work factor and size of the process pool dedicated to hashing
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+HASH_POOL_SIZE = int(os.getenv("HASH_POOL_SIZE", str(os.cpu_count() or 2)))
+
+# Pinning min/max rounds to BCRYPT_ROUNDS marks hashes made with another work factor
+# as outdated, so verify_and_update returns a fresh hash on the next successful login.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS,
+)
+
+_pool = None
+
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=HASH_POOL_SIZE)
+    return _pool
+
+
+def shutdown_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def hash_password_sync(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def verify_password_sync(password: str, hashed_password: str):
+    """Returns (valid, new_hash), where new_hash is None unless the hash must be upgraded."""
+    return pwd_context.verify_and_update(password, hashed_password)
+
+
+async def hash_password(password: str) -> str:
+    """Hashes the password in the process pool without blocking the server."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_pool(), hash_password_sync, password)
+
+
+async def verify_password(password: str, hashed_password: str):
+    """Verifies the password in the process pool. Returns (valid, new_hash or None)."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_pool(), verify_password_sync, password, hashed_password)
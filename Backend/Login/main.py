@@ -1,11 +1,15 @@
 from fastapi import FastAPI, Depends, HTTPException, status
 from sqlalchemy.orm import Session
+from fastapi.responses import StreamingResponse
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from jose import JWTError, jwt
 from datetime import datetime, timedelta
-from passlib.context import CryptContext
+import json
+from starlette.concurrency import run_in_threadpool
 from models import User
 from database import SessionLocal, engine
+from hashing import hash_password, verify_password, shutdown_pool
+from token_cache import TokenCache
 from pydantic import BaseModel
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -34,13 +38,18 @@ def get_db():
     finally:
         db.close()
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+@app.on_event("shutdown")
+def stop_hash_pool():
+    shutdown_pool()
 
 # Your JWT secret and algorithm
 SECRET_KEY = "your_secret_key"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
+# Verified token claims, so repeated verifications skip the JWT decode
+token_cache = TokenCache()
+
 class UserCreate(BaseModel):
     username: str
     password: str
@@ -54,27 +63,36 @@ async def root():
 def get_user_by_username(db: Session, username: str):
     return db.query(User).filter(User.username == username).first()
 
-def create_user(db: Session, user: UserCreate):
-    hashed_password = pwd_context.hash(user.password)
+def create_user(db: Session, user: UserCreate, hashed_password: str):
     db_user = User(username=user.username, hashed_password=hashed_password, fullname=user.fullname, company=user.company)
     db.add(db_user)
     db.commit()
     return "complete"
 
 @app.post("/register")
-def register_user(user: UserCreate, db: Session = Depends(get_db)):
-    db_user = get_user_by_username(db, username=user.username)
+async def register_user(user: UserCreate, db: Session = Depends(get_db)):
+    db_user = await run_in_threadpool(get_user_by_username, db, username=user.username)
     if db_user:
         raise HTTPException(status_code=400, detail="Username already registered")
-    return create_user(db=db, user=user)
+    # bcrypt runs in the dedicated process pool, not in the request threadpool
+    hashed_password = await hash_password(user.password)
+    return await run_in_threadpool(create_user, db=db, user=user, hashed_password=hashed_password)
+
+def update_password_hash(db: Session, user: User, hashed_password: str):
+    user.hashed_password = hashed_password
+    db.commit()
 
 # Authenticate the user
-def authenticate_user(username: str, password: str, db: Session):
-    user = db.query(User).filter(User.username == username).first()
+async def authenticate_user(username: str, password: str, db: Session):
+    user = await run_in_threadpool(get_user_by_username, db, username=username)
     if not user:
         return False
-    if not pwd_context.verify(password, user.hashed_password):
+    valid, new_hash = await verify_password(password, user.hashed_password)
+    if not valid:
         return False
+    if new_hash:
+        # The bcrypt parameters changed: transparently store the rehashed password
+        await run_in_threadpool(update_password_hash, db, user, new_hash)
     return user
 
 # Create access token
@@ -89,8 +107,8 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None):
     return encoded_jwt
 
 @app.post("/token")
-def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = authenticate_user(form_data.username, form_data.password, db)
+async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+    user = await authenticate_user(form_data.username, form_data.password, db)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -104,11 +122,17 @@ def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db:
     return {"access_token": access_token, "token_type": "bearer"}
 
 def verify_token(token: str = Depends(oauth2_scheme)):
+    cached = token_cache.get(token)
+    if cached is not None:
+        return cached
+    if token_cache.is_revoked(token):
+        raise HTTPException(status_code=403, detail="Token is invalid or expired")
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         username: str = payload.get("sub")
         if username is None:
             raise HTTPException(status_code=403, detail="Token is invalid or expired")
+        token_cache.put(token, payload)
         return payload
     except JWTError:
         raise HTTPException(status_code=403, detail="Token is invalid or expired")
@@ -118,10 +142,43 @@ async def verify_user_token(token: str):
     verify_token(token=token)
     return {"message": "Token is valid"}
 
+@app.post("/revoke-token")
+async def revoke_user_token(token: str = Depends(oauth2_scheme)):
+    payload = verify_token(token=token)
+    token_cache.revoke(token, payload["exp"])
+    return {"message": "Token revoked"}
+
+USERS_PAGE_SIZE = 100
+USERS_MAX_PAGE_SIZE = 1000
+
+# Keyset pagination: pass the X-Next-Cursor header of a page as `after_id` to get the next one
 @app.get("/users")
-def get_users(db: Session = Depends(get_db)):
-    users = db.query(User).all()
-    return [{"id": user.id, "username": user.username, "fullname": user.fullname, "company": user.company} for user in users]
+def get_users(after_id: int = 0, limit: int = USERS_PAGE_SIZE, company: str | None = None):
+    limit = max(1, min(limit, USERS_MAX_PAGE_SIZE))
+    db = SessionLocal()
+    query = db.query(User.id, User.username, User.fullname, User.company).filter(User.id > after_id)
+    if company:
+        query = query.filter(User.company == company)
+    query = query.order_by(User.id)
+    try:
+        # The id of the page's last row is the next cursor, but only if more rows follow it
+        boundary = query.with_entities(User.id).offset(limit - 1).limit(2).all()
+    except Exception:
+        db.close()
+        raise
+    headers = {"X-Next-Cursor": str(boundary[0][0])} if len(boundary) == 2 else {}
+
+    def stream_users():
+        try:
+            yield "["
+            for i, user in enumerate(query.limit(limit).yield_per(500)):
+                row = {"id": user.id, "username": user.username, "fullname": user.fullname, "company": user.company}
+                yield ("," if i else "") + json.dumps(row)
+            yield "]"
+        finally:
+            db.close()
+
+    return StreamingResponse(stream_users(), media_type="application/json", headers=headers)
 
 @app.get("/user/{username}")
 def get_user_by_username_endpoint(username: str, db: Session = Depends(get_db)):
@@ -9,10 +9,14 @@ class User(Base):
     username = Column(String, unique=True, index=True)
     hashed_password = Column(String)
     fullname = Column(String)
-    company = Column(String)
+    company = Column(String, index=True)
 
     
 
 # Create the database tables if they don't exist
 
 User.metadata.create_all(bind=engine)
+
+# create_all does not add new indexes to existing tables (e.g. ix_users_company)
+for index in User.__table__.indexes:
+    index.create(bind=engine, checkfirst=True)
@@ -0,0 +1,65 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+
+
+def _token_key(token: str) -> str:
+    # Only a digest of the token is kept in memory, never the token itself
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class TokenCache:
+    """
+    LRU cache of verified JWT claims keyed by the token hash. Each entry lives
+    until the token's own `exp`, so expired tokens are never served from cache.
+    Revoked tokens are remembered (until they would have expired) and rejected.
+    """
+
+    def __init__(self, max_entries: int = TOKEN_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._claims = OrderedDict()  # key -> (exp, claims)
+        self._revoked = {}  # key -> exp
+        self._lock = threading.Lock()
+
+    def get(self, token: str):
+        key = _token_key(token)
+        now = time.time()
+        with self._lock:
+            entry = self._claims.get(key)
+            if entry is None:
+                return None
+            exp, claims = entry
+            if exp <= now or key in self._revoked:
+                del self._claims[key]
+                return None
+            self._claims.move_to_end(key)
+            return dict(claims)
+
+    def put(self, token: str, claims: dict):
+        exp = claims.get("exp")
+        if exp is None:
+            return
+        key = _token_key(token)
+        with self._lock:
+            self._claims[key] = (float(exp), dict(claims))
+            self._claims.move_to_end(key)
+            while len(self._claims) > self.max_entries:
+                self._claims.popitem(last=False)
+
+    def revoke(self, token: str, exp: float):
+        key = _token_key(token)
+        now = time.time()
+        with self._lock:
+            self._claims.pop(key, None)
+            self._revoked[key] = float(exp)
+            # Forget revocations of tokens that have expired anyway
+            for revoked_key in [k for k, e in self._revoked.items() if e <= now]:
+                del self._revoked[revoked_key]
+
+    def is_revoked(self, token: str) -> bool:
+        with self._lock:
+            return _token_key(token) in self._revoked
@@ -1,31 +1,46 @@
 #SOPHIA CHAT
 #LANG CHAIN
 import os
+from functools import lru_cache
 from dotenv import load_dotenv
 from langchain_openai import ChatOpenAI
-from langchain.agents import initialize_agent, AgentType
-from langchain.memory import ConversationBufferMemory
-from langchain.schema import SystemMessage  # Importa el mensaje del sistema
+from langchain.agents import AgentType, create_openai_tools_agent, initialize_agent
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+import meraki_utils
+from meraki_tools import structured_tools_meraki
 from meraki_utils import tools_meraki
+from parallel_agent import ParallelAgentExecutor
+from token_memory import TokenBudgetMemory
 
 # Cargar variables de entorno
 load_dotenv()
 
 # Cargar API Key de OpenAI
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-if not OPENAI_API_KEY:
-    raise ValueError("❌ ERROR: La clave OPENAI_API_KEY no está definida en el archivo .env")
 
-# Inicializar el modelo de OpenAI
-llm = ChatOpenAI(model="gpt-4-turbo", temperature=0, openai_api_key=OPENAI_API_KEY)
+# Modo del agente: "tools" (llamadas a funciones nativas con argumentos tipados) o
+# "react" (agente conversacional ReAct con herramientas de texto libre)
+AGENT_MODE = os.getenv("SOPHIA_AGENT_MODE", "tools").lower()
+# Herramientas que el agente "tools" ejecuta a la vez cuando el modelo pide varias en un paso
+MAX_PARALLEL_TOOLS = int(os.getenv("SOPHIA_MAX_PARALLEL_TOOLS", "8"))
 
-# Memoria mejorada para LangChain
-memory = ConversationBufferMemory(
-    memory_key="chat_history",
-    return_messages=True
-)
 
-# Agregar el prompt de contexto como mensaje del sistema
+@lru_cache(maxsize=None)
+def get_llm():
+    """Crea (una sola vez, en el primer uso) el modelo de OpenAI compartido por todas las sesiones."""
+    if not OPENAI_API_KEY:
+        raise ValueError("❌ ERROR: La clave OPENAI_API_KEY no está definida en el archivo .env")
+    # streaming=True permite emitir los tokens de la respuesta final por SSE (/chat/stream/);
+    # stream_usage=True mantiene el conteo de tokens de cada llamada aun en streaming (/metrics)
+    return ChatOpenAI(model="gpt-4-turbo", temperature=0, openai_api_key=OPENAI_API_KEY,
+                      streaming=True, stream_usage=True)
+
+# Presupuesto de tokens del historial de conversación
+MEMORY_MAX_TOKENS = int(os.getenv("SOPHIA_MEMORY_MAX_TOKENS", "2000"))
+MEMORY_WINDOW_TURNS = int(os.getenv("SOPHIA_MEMORY_WINDOW_TURNS", "6"))
+MEMORY_MAX_MESSAGE_TOKENS = int(os.getenv("SOPHIA_MEMORY_MAX_MESSAGE_TOKENS", "500"))
+
+# Prompt de contexto, fijado como mensaje del sistema en la memoria
 context_prompt = (
     "Eres una agente asistente experta en Cisco Meraki. "
     "Tu nombre es SOPHIA eres la IA hecha por TXDX SECURE"
@@ -35,20 +50,74 @@ context_prompt = (
     "el input de las funciones debe estar en un json siempre"
     "Aclaracion: por lo general el org_id es un numero y el network_id lo tienes que sacar usando el tool list_networks"
 )
-memory.chat_memory.add_message(SystemMessage(content=context_prompt))
 
-# Crear el agente con memoria y herramientas de Meraki
 
-agent = initialize_agent(
-    tools=tools_meraki,
-    llm=llm,
-    agent=AgentType.CONVERSATIONAL_REACT_DESCRIPTION,  # Cambiado para conversaciones
-    memory=memory,  # Se usa la misma memoria que contiene el prompt de contexto
-    verbose=True
-)
+def create_memory(llm=None):
+    """
+    Crea una memoria de conversación nueva con el prompt de contexto fijo y un
+    presupuesto de tokens (ventana de turnos recientes + resumen de los anteriores).
+    'llm' (por defecto el modelo compartido) se usa para contar tokens y resumir.
+    """
+    return TokenBudgetMemory(
+        llm=llm or get_llm(),
+        memory_key="chat_history",
+        return_messages=True,
+        system_prompt=context_prompt,
+        max_token_limit=MEMORY_MAX_TOKENS,
+        window_turns=MEMORY_WINDOW_TURNS,
+        max_message_tokens=MEMORY_MAX_MESSAGE_TOKENS,
+    )
+
+
+# Prompt del agente con llamadas a funciones: el historial ya incluye el prompt de contexto
+tools_prompt = ChatPromptTemplate.from_messages([
+    ("system", "Cuando necesites varios datos independientes, pide todas las herramientas en un mismo paso: "
+               "se ejecutan en paralelo."),
+    MessagesPlaceholder("chat_history"),
+    ("human", "{input}"),
+    MessagesPlaceholder("agent_scratchpad"),
+])
+
+
+def create_agent(memory=None, llm=None, mode=None):
+    """
+    Crea un agente con su propia memoria y las herramientas de Meraki.
+    Cada sesión de chat debe usar su propio agente para no mezclar historiales.
+    'llm' permite usar otro modelo (p. ej. uno simulado en los benchmarks) y 'mode'
+    elegir entre "tools" y "react" (por defecto AGENT_MODE).
+    """
+    mode = (mode or AGENT_MODE).lower()
+    llm = llm or get_llm()
+    memory = memory or create_memory()  # La memoria contiene el prompt de contexto
+    if mode == "react":
+        return initialize_agent(
+            tools=tools_meraki,
+            llm=llm,
+            agent=AgentType.CONVERSATIONAL_REACT_DESCRIPTION,  # Cambiado para conversaciones
+            memory=memory,
+            verbose=True,
+            metadata={"agent_mode": "react"},
+        )
+    if mode != "tools":
+        raise ValueError(f"❌ ERROR: SOPHIA_AGENT_MODE desconocido: {mode} (usar 'tools' o 'react')")
+    return ParallelAgentExecutor(
+        agent=create_openai_tools_agent(llm, structured_tools_meraki, tools_prompt),
+        tools=structured_tools_meraki,
+        memory=memory,
+        max_parallel_tools=MAX_PARALLEL_TOOLS,
+        verbose=True,
+        metadata={"agent_mode": "tools"},
+    )
+
+
+def warmup():
+    """Inicializa por adelantado el modelo, el cliente de Meraki y el índice de inventario."""
+    get_llm()
+    meraki_utils.warmup()
 
 
 def chat_with_agent():
+    agent = create_agent()
     print("\n🤖 SOPHIA with LangChain - Chat Activo")
     print("Escribe 'salir' para terminar la conversación.\n")
 
@@ -59,8 +128,8 @@ def chat_with_agent():
             break
 
         try:
-            # Envía directamente el input del usuario; la memoria ya contiene el contexto
-            response = agent.invoke(user_input)
+            # Solo el input del usuario: la memoria ya contiene el contexto
+            response = agent.invoke({"input": user_input})
             print(f"🤖 SOPHIA: {response.get('output', '')}\n")
         except Exception as e:
             print(f"❌ Error: {e}\n")
@@ -0,0 +1,108 @@
+import time
+from langchain_core.callbacks import BaseCallbackHandler
+from metrics import (
+    AGENT_ITERATIONS, LLM_CALLS_PER_TURN, LLM_ERRORS, LLM_LATENCY, LLM_TOKENS,
+    MEMORY_PROMPT_TOKENS, TOOL_ERRORS, TOOL_LATENCY, current_trace,
+)
+
+
+def _token_usage(response):
+    """Tokens de prompt y de respuesta de un LLMResult (con o sin streaming)."""
+    usage = (response.llm_output or {}).get("token_usage") or {}
+    if usage:
+        return usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0)
+    prompt = completion = 0
+    for generations in response.generations:
+        for generation in generations:
+            metadata = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+            prompt += metadata.get("input_tokens", 0)
+            completion += metadata.get("output_tokens", 0)
+    return prompt, completion
+
+
+class MetricsCallbackHandler(BaseCallbackHandler):
+    """
+    Mide cada llamada al LLM (latencia, tokens, errores) y cada herramienta del agente
+    (latencia, errores), y cuenta acciones y llamadas al LLM por turno. Se crea uno por turno.
+    """
+
+    run_inline = True  # Es barato: no hace falta ejecutarlo en un hilo aparte
+
+    def __init__(self):
+        self._started = {}
+        self.actions = 0
+        self.llm_calls = 0
+
+    def _start(self, run_id, name):
+        self._started[run_id] = (name, time.perf_counter())
+
+    def _stop(self, run_id):
+        name, started = self._started.pop(run_id, ("desconocido", time.perf_counter()))
+        return name, time.perf_counter() - started
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        model = ((kwargs.get("invocation_params") or {}).get("model_name")
+                 or (kwargs.get("invocation_params") or {}).get("model")
+                 or (serialized or {}).get("name", "llm"))
+        self._start(run_id, model)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self.on_llm_start(serialized, [], run_id=run_id, **kwargs)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        model, seconds = self._stop(run_id)
+        self.llm_calls += 1
+        prompt_tokens, completion_tokens = _token_usage(response)
+        LLM_LATENCY.observe(seconds, model)
+        LLM_TOKENS.inc(model, "prompt", value=prompt_tokens)
+        LLM_TOKENS.inc(model, "completion", value=completion_tokens)
+        trace = current_trace()
+        if trace is not None:
+            trace.add_span("llm", model, seconds, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        model, seconds = self._stop(run_id)
+        self.llm_calls += 1
+        LLM_ERRORS.inc(model)
+        trace = current_trace()
+        if trace is not None:
+            trace.add_span("llm", model, seconds, error)
+
+    def on_agent_action(self, action, **kwargs):
+        self.actions += 1
+
+    def on_tool_start(self, serialized, input_str, *, run_id, **kwargs):
+        self._start(run_id, (serialized or {}).get("name", "tool"))
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        tool, seconds = self._stop(run_id)
+        TOOL_LATENCY.observe(seconds, tool)
+        # Las herramientas de meraki_utils informan los fallos devolviendo {"error": ...},
+        # que shape_observation convierte en "error: ..."
+        error = output.get("error") if isinstance(output, dict) else None
+        if error is None and isinstance(output, str) and output.startswith(("error:", "{'error'")):
+            error = output
+        if error:
+            TOOL_ERRORS.inc(tool)
+        trace = current_trace()
+        if trace is not None:
+            trace.add_span("tool", tool, seconds, error)
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        tool, seconds = self._stop(run_id)
+        TOOL_LATENCY.observe(seconds, tool)
+        TOOL_ERRORS.inc(tool)
+        trace = current_trace()
+        if trace is not None:
+            trace.add_span("tool", tool, seconds, error)
+
+    def finish_turn(self, memory=None):
+        """Cierra el turno; con la memoria del agente registra también los tokens de su historial."""
+        AGENT_ITERATIONS.observe(self.actions)
+        LLM_CALLS_PER_TURN.observe(self.llm_calls)
+        if memory is not None and hasattr(memory, "metrics"):
+            usage = memory.metrics()
+            MEMORY_PROMPT_TOKENS.observe(usage["last_prompt_tokens"])
+            trace = current_trace()
+            if trace is not None:
+                trace.annotate(memory=usage)
@@ -0,0 +1,91 @@
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+
+def normalize_question(text):
+    """Minúsculas, sin tildes, sin signos de puntuación y con los espacios colapsados."""
+    text = unicodedata.normalize("NFKD", str(text).lower())
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    text = re.sub(r"[¿?¡!.,;:\"'`]+", " ", text)
+    return " ".join(text.split())
+
+
+class AnswerCache:
+    """
+    Caché de respuestas del agente por pregunta normalizada. Cada respuesta guarda los
+    datos del Dashboard de los que dependió (meraki_cache.Dependencies) y deja de servirse
+    en cuanto alguno vence, se invalida o se vuelve a pedir, o al cumplirse 'max_ttl'
+    (tope para lo que no pasa por la caché del Dashboard, como el índice de inventario).
+    Acotada a 'max_entries' con desalojo LRU. Segura para varios hilos.
+    """
+
+    def __init__(self, max_entries=256, max_ttl=300):
+        self.max_entries = max_entries
+        self.max_ttl = max_ttl
+        self._data = OrderedDict()  # pregunta normalizada -> (expires_at, respuesta, dependencias)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.evictions = 0
+
+    def get(self, question):
+        """Retorna la respuesta vigente para 'question' o None."""
+        key = normalize_question(question)
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, answer, dependencies = entry
+        if expires_at <= time.monotonic() or (dependencies is not None and not dependencies.is_current()):
+            with self._lock:
+                if self._data.get(key) is entry:
+                    del self._data[key]
+                self.stale += 1
+                self.misses += 1
+            return None
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+            self.hits += 1
+        return answer
+
+    def set(self, question, answer, dependencies=None):
+        """
+        Guarda la respuesta salvo que haya dependido de llamadas sin caché. Vence con el
+        primero de sus datos, sin superar 'max_ttl'.
+        """
+        if self.max_ttl <= 0 or (dependencies is not None and dependencies.uncacheable):
+            return False
+        expires_at = time.monotonic() + self.max_ttl
+        if dependencies is not None:
+            expires_at = min(expires_at, dependencies.expires_at() or expires_at)
+        key = normalize_question(question)
+        with self._lock:
+            self._data[key] = (expires_at, answer, dependencies)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+        return True
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "stale": self.stale,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            }
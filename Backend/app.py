@@ -1,35 +1,219 @@
+import asyncio
+import os
+import sys
+import time
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
-from Sophia import agent  # Importamos el agente de LangChain
+from starlette.concurrency import run_in_threadpool
+from answer_cache import AnswerCache
+from intent_router import IntentRouter
+from meraki_cache import record_dependencies
+from metrics import REGISTRY, Trace, current_trace
+from sessions import AgentRegistry
 
-app = FastAPI()
+# Límites de sesiones y de llamadas simultáneas al LLM
+MAX_SESSIONS = int(os.getenv("SOPHIA_MAX_SESSIONS", "500"))
+SESSION_IDLE_TTL = int(os.getenv("SOPHIA_SESSION_IDLE_TTL", "1800"))
+MAX_CONCURRENT_LLM_CALLS = int(os.getenv("SOPHIA_MAX_CONCURRENT_LLM_CALLS", "16"))
+
+# Caché de respuestas de /chat/: tope de vigencia (0 la desactiva) y cantidad de preguntas
+ANSWER_CACHE_TTL = int(os.getenv("SOPHIA_ANSWER_CACHE_TTL", "300"))
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("SOPHIA_ANSWER_CACHE_MAX_ENTRIES", "256"))
+
+# Enrutador de intenciones: responde preguntas frecuentes sin el LLM ("off" lo desactiva)
+SOPHIA_INTENT_ROUTER = os.getenv("SOPHIA_INTENT_ROUTER", "on").lower()
+
+# Precalentamiento al arrancar: "background" (no retrasa el arranque), "blocking" (espera
+# a que el modelo, el cliente de Meraki y el inventario estén listos) u "off" (todo perezoso,
+# sin sincronización de inventario)
+SOPHIA_WARMUP = os.getenv("SOPHIA_WARMUP", "background").lower()
+
+
+def create_agent():
+    # Sophia (LangChain, OpenAI, SDK de Meraki) se importa recién con el primer agente
+    from Sophia import create_agent as create_sophia_agent
+    return create_sophia_agent()
+
+
+def start_backend():
+    """Precalienta el modelo y el cliente de Meraki e inicia la sincronización del inventario."""
+    import Sophia
+    from meraki_utils import start_inventory_sync
+    Sophia.warmup()
+    start_inventory_sync()
+
+
+@asynccontextmanager
+async def lifespan(app):
+    warmup_task = None
+    if SOPHIA_WARMUP == "blocking":
+        await run_in_threadpool(start_backend)
+    elif SOPHIA_WARMUP == "background":
+        async def warmup():
+            try:
+                await run_in_threadpool(start_backend)
+            except Exception as e:
+                print("Error en el precalentamiento:", e)
+        warmup_task = asyncio.create_task(warmup())
+    yield
+    if warmup_task is not None:
+        warmup_task.cancel()
+    if "meraki_utils" in sys.modules:
+        sys.modules["meraki_utils"].stop_inventory_sync()
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  
-    allow_credentials=True,
-    allow_methods=["*"],  
-    allow_headers=["*"], 
-)
 
 class UserInput(BaseModel):
     message: str
+    session_id: str = "default"
+
+
+def create_app(agent_factory=create_agent):
+    """
+    Fábrica de la aplicación: nada pesado se importa ni se construye aquí.
+    'agent_factory' crea el agente de cada sesión (los benchmarks inyectan uno con un LLM simulado).
+    """
+    app = FastAPI(lifespan=lifespan)
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    sessions = AgentRegistry(agent_factory, max_sessions=MAX_SESSIONS, idle_ttl=SESSION_IDLE_TTL)
+    llm_slots = asyncio.Semaphore(MAX_CONCURRENT_LLM_CALLS)
+    background_tasks = set()  # Referencias a los turnos en curso de /chat/stream/
+    answers = AnswerCache(max_entries=ANSWER_CACHE_MAX_ENTRIES, max_ttl=ANSWER_CACHE_TTL)
+    router = IntentRouter() if SOPHIA_INTENT_ROUTER != "off" else None
+    app.state.sessions = sessions
+    app.state.answers = answers
+
+    def remember(session, question, answer):
+        """Agrega a la memoria de la sesión un turno respondido sin el agente."""
+        memory = getattr(session.agent, "memory", None)
+        if memory is not None:
+            memory.save_context({"input": question}, {"output": answer})
+
+    async def fast_answer(session, question):
+        """
+        Respuesta sin el agente: primero el enrutador de intenciones y luego la caché de
+        respuestas. Retorna None si la pregunta tiene que pasar por el agente.
+        La caché solo guarda primeros turnos, así que solo se consulta en el primer turno
+        de la sesión: más adelante la respuesta puede depender del historial.
+        """
+        started = time.perf_counter()
+        answer, source = None, None
+        if router is not None:
+            answer, source = await run_in_threadpool(router.answer, question), "intent_router"
+        if answer is None and session.turns == 0:
+            answer, source = answers.get(question), "answer_cache"
+        if answer is None:
+            return None
+        current_trace().add_span(source, "hit", time.perf_counter() - started)
+        async with session.lock:
+            await run_in_threadpool(remember, session, question, answer)
+            session.turns += 1
+        return answer
+
+    @app.post("/chat/")
+    async def chat(user_input: UserInput):
+        from agent_metrics import MetricsCallbackHandler  # Depende de LangChain: import perezoso
+        try:
+            session = await run_in_threadpool(sessions.get, user_input.session_id)
+            handler = MetricsCallbackHandler()
+            with Trace("/chat/", user_input.session_id):
+                answer = await fast_answer(session, user_input.message)
+                if answer is not None:
+                    return {"response": answer, "session_id": user_input.session_id}
+                async with session.lock, llm_slots:
+                    # Solo el primer turno de una sesión no depende de la conversación previa
+                    first_turn = session.turns == 0
+                    with record_dependencies() as dependencies:
+                        response = await session.agent.ainvoke(
+                            {"input": user_input.message}, config={"callbacks": [handler]}
+                        )
+                    session.turns += 1
+                handler.finish_turn(getattr(session.agent, "memory", None))
+            print("Respuesta del agente:", response)
+            output = response.get("output", "Error en la respuesta") if isinstance(response, dict) else str(response)
+            if first_turn and isinstance(response, dict) and "output" in response:
+                answers.set(user_input.message, output, dependencies)
+            return {"response": output, "session_id": user_input.session_id}
+        except Exception as e:
+            print("Error en la API:", e)
+            raise HTTPException(status_code=500, detail=str(e))
+
+    @app.post("/chat/stream/")
+    async def chat_stream(user_input: UserInput):
+        """
+        Igual que /chat/, pero responde con Server-Sent Events: eventos de inicio y fin de cada
+        herramienta (con su duración), tokens de la respuesta final y un evento 'done' al terminar.
+        """
+        from agent_metrics import MetricsCallbackHandler
+        from streaming import SSECallbackHandler, final_answer_prefix  # Depende de LangChain: import perezoso
+        session = await run_in_threadpool(sessions.get, user_input.session_id)
+        handler = SSECallbackHandler(final_prefix=final_answer_prefix(session.agent))
+        metrics_handler = MetricsCallbackHandler()
+
+        async def run_agent():
+            try:
+                with Trace("/chat/stream/", user_input.session_id):
+                    answer = await fast_answer(session, user_input.message)
+                    if answer is not None:
+                        return await handler.finish(answer)
+                    async with session.lock, llm_slots:
+                        response = await session.agent.ainvoke(
+                            {"input": user_input.message}, config={"callbacks": [handler, metrics_handler]}
+                        )
+                        session.turns += 1
+                    metrics_handler.finish_turn(getattr(session.agent, "memory", None))
+                output = response.get("output", "Error en la respuesta") if isinstance(response, dict) else str(response)
+                await handler.finish(output)
+            except Exception as e:
+                print("Error en la API:", e)
+                await handler.fail(e)
+
+        task = asyncio.create_task(run_agent())
+        background_tasks.add(task)
+        task.add_done_callback(background_tasks.discard)
+        return StreamingResponse(
+            handler.events(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    @app.delete("/chat/{session_id}")
+    def end_session(session_id: str):
+        if not sessions.drop(session_id):
+            raise HTTPException(status_code=404, detail="Sesión no encontrada")
+        return {"message": "Sesión finalizada"}
+
+    @app.get("/metrics")
+    def metrics():
+        """Métricas en formato de texto de Prometheus (latencias, errores, tokens, caché, colas)."""
+        answer_stats = answers.stats()
+        app_gauges = [
+            ("sophia_active_sessions", "Sesiones de agente en memoria", {}, len(sessions)),
+            ("sophia_answer_cache_entries", "Respuestas en la caché de /chat/", {}, answer_stats["entries"]),
+            ("sophia_answer_cache_hits", "Preguntas respondidas desde la caché", {}, answer_stats["hits"]),
+            ("sophia_answer_cache_misses", "Preguntas que pasaron por el agente", {}, answer_stats["misses"]),
+            ("sophia_answer_cache_stale", "Respuestas descartadas por datos vencidos", {}, answer_stats["stale"]),
+        ]
+        if router is not None:
+            app_gauges.append(("sophia_router_hit_rate", "Fracción de preguntas respondidas por el enrutador",
+                               {}, router.stats()["hit_rate"]))
+        return PlainTextResponse(REGISTRY.render(app_gauges), media_type="text/plain; version=0.0.4")
+
+    @app.get("/")
+    def root():
+        return {"message": "Bienvenido a la API de SOPHIA"}
+
+    return app
+
 
-@app.post("/chat/")
-def chat(user_input: UserInput):
-    try:
-        response = agent.invoke(user_input.message)
-        print("Respuesta del agente:", response)
-        if isinstance(response, dict):
-            return {"response": response.get("output", "Error en la respuesta")}
-        else:
-            return {"response": str(response)}
-    except Exception as e:
-        print("Error en la API:", e)
-        raise HTTPException(status_code=500, detail=str(e))
-
-
-@app.get("/")
-def root():
-    return {"message": "Bienvenido a la API de SOPHIA"}
+app = create_app()
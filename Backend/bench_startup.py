@@ -0,0 +1,34 @@
+# Mide el arranque en frío de la API: tiempo de import de app.py y tiempo hasta la primera respuesta de "/".
+# Cada medición corre en un proceso nuevo. Uso: python bench_startup.py [repeticiones]
+import statistics
+import subprocess
+import sys
+
+SNIPPET = """
+import os, time
+os.environ.setdefault("SOPHIA_WARMUP", "off")
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(app.app) as client:
+    client.get("/")
+served = time.perf_counter()
+print(imported - start, served - start)
+"""
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    imports, firsts = [], []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", SNIPPET], capture_output=True, text=True, check=True)
+        imported, served = map(float, out.stdout.split()[-2:])
+        imports.append(imported)
+        firsts.append(served)
+    print(f"import app:        mediana {statistics.median(imports) * 1000:.0f} ms")
+    print(f"primera respuesta: mediana {statistics.median(firsts) * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
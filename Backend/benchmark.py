@@ -0,0 +1,253 @@
+"""
+Benchmark offline de SOPHIA: corre las herramientas de meraki_utils y el endpoint /chat/
+contra el servidor simulado de Meraki (meraki_stub.py) y un modelo de chat con guion,
+sin consumir la API real ni OpenAI.
+
+Mide, por herramienta, la latencia y las llamadas a la API en frío (sin caché) y en
+caliente; y para /chat/, el throughput, la latencia p50/p95 y el pico de memoria bajo
+concurrencia, por separado para el agente (sin enrutador de intenciones ni caché de
+respuestas) y para el enrutador. Guarda los resultados en bench_results/ y, con --compare, muestra la
+diferencia contra una corrida anterior.
+
+Uso: python benchmark.py --clients 20000 --latency-ms 80 --concurrency 16 --requests 64
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from meraki_stub import StubData, StubServer
+from observations import shape_observation
+
+NETWORK_ID = "L_0"
+ORG_ID = "1"
+
+# Guion del modelo simulado para cada pregunta: una herramienta y luego la respuesta final
+CHAT_SCRIPT = [
+    'Thought: Do I need to use a tool? Yes\nAction: Estado de la Red\nAction Input: {"network_id": "L_0"}',
+    "Thought: Do I need to use a tool? No\nAI: La red L_0 está operativa.",
+]
+
+# El mismo guion para el agente con llamadas a funciones (SOPHIA_AGENT_MODE=tools)
+TOOLS_CHAT_SCRIPT = [
+    {"tool_calls": [{"name": "get_network_status", "args": {"network_id": "L_0"}}]},
+    {"content": "La red L_0 está operativa."},
+]
+
+
+def configure_environment(stub, workdir):
+    """Apunta SOPHIA al servidor simulado. Debe llamarse antes de importar meraki_utils/Sophia."""
+    os.environ.update({
+        "MERAKI_KEY": "benchmark",
+        "MERAKI_BASE_URL": stub.base_url,
+        "OPENAI_API_KEY": "benchmark",
+        "INVENTORY_DB_PATH": os.path.join(workdir, "inventory.db"),
+        "CHANNEL_DB_PATH": os.path.join(workdir, "channel_history.db"),
+        "INVENTORY_SYNC_INTERVAL": "0",
+        "SOPHIA_WARMUP": "off",
+        "SOPHIA_TRACE_LOG": "off",
+        # La pregunta del benchmark la reconoce el enrutador: el escenario del agente lo
+        # desactiva, igual que la caché de respuestas, para medir el ciclo del LLM
+        "SOPHIA_INTENT_ROUTER": "off",
+        "SOPHIA_ANSWER_CACHE_TTL": "0",
+    })
+
+
+def scripted_llm(responses):
+    """Modelo de chat que responde siguiendo 'responses' en ciclo (sin tokenizador externo)."""
+    from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+    class ScriptedChatModel(FakeListChatModel):
+        def get_num_tokens(self, text):
+            return max(1, len(text) // 4)
+
+    return ScriptedChatModel(responses=responses)
+
+
+def scripted_tools_llm(script):
+    """Modelo de chat con guion que emite llamadas a funciones nativas (acepta bind_tools)."""
+    from langchain_core.language_models.fake_chat_models import FakeMessagesListChatModel
+    from langchain_core.messages import AIMessage
+
+    class ScriptedToolsChatModel(FakeMessagesListChatModel):
+        def bind_tools(self, tools, **kwargs):
+            return self
+
+        def get_num_tokens(self, text):
+            return max(1, len(text) // 4)
+
+    messages = [
+        AIMessage(content=step.get("content", ""), tool_calls=[
+            {"name": call["name"], "args": call["args"], "id": f"call_{i}_{j}"}
+            for j, call in enumerate(step.get("tool_calls", []))
+        ])
+        for i, step in enumerate(script)
+    ]
+    return ScriptedToolsChatModel(responses=messages)
+
+
+def tool_scenarios(mu):
+    return {
+        "list_organizations": lambda: mu.list_organizations(),
+        "list_networks": lambda: mu.list_networks(ORG_ID),
+        "list_devices": lambda: mu.list_devices(NETWORK_ID),
+        "list_clients[list]": lambda: mu.list_clients(NETWORK_ID),
+        "list_clients[count]": lambda: mu.list_clients(NETWORK_ID, mode="count", group_by="ssid"),
+        "list_clients[top]": lambda: mu.list_clients(NETWORK_ID, mode="top", limit=10),
+        "get_network_status": lambda: mu.get_network_status(NETWORK_ID),
+        "list_wireless_channels": lambda: mu.list_wireless_channels(NETWORK_ID),
+        "wireless_channel_trends": lambda: mu.wireless_channel_trends(NETWORK_ID),
+        "list_saturated_ports": lambda: mu.list_saturated_ports(NETWORK_ID),
+        "list_vlans": lambda: mu.list_vlans(NETWORK_ID),
+        "list_firewall_rules": lambda: mu.list_firewall_rules(NETWORK_ID),
+        "list_cameras": lambda: mu.list_cameras(NETWORK_ID),
+        "org_network_status": lambda: mu.org_network_status(ORG_ID),
+        "org_saturated_ports": lambda: mu.org_saturated_ports(ORG_ID),
+    }
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return (time.perf_counter() - start) * 1000, result
+
+
+def bench_tools(stub):
+    import meraki_utils as mu
+    results = {}
+    for name, fn in tool_scenarios(mu).items():
+        mu.dashboard.invalidate()
+        mu.camera_index.invalidate()
+        stub.reset_calls()
+        cold_ms, output = timed(fn)
+        cold_calls = sum(stub.snapshot_calls().values())
+        stub.reset_calls()
+        warm_ms, _ = timed(fn)
+        results[name] = {
+            "cold_ms": round(cold_ms, 1),
+            "cold_api_calls": cold_calls,
+            "warm_ms": round(warm_ms, 1),
+            "warm_api_calls": sum(stub.snapshot_calls().values()),
+            "output_chars": len(json.dumps(output, default=str, ensure_ascii=False)),
+            "observation_chars": len(shape_observation(name.split("[")[0], output)),
+            "error": output.get("error") if isinstance(output, dict) else None,
+        }
+        print(f"  {name:<24} frío {cold_ms:8.1f} ms ({cold_calls} llamadas)  caliente {warm_ms:7.1f} ms")
+    return results
+
+
+async def bench_chat(stub, concurrency, requests, sessions, agent_mode, router=False):
+    """/chat/ con el agente o, con 'router', con el enrutador de intenciones delante."""
+    import httpx
+    import Sophia
+    import app as app_module
+
+    def agent_factory():
+        memory = Sophia.create_memory(llm=scripted_llm(["Resumen de la conversación."]))
+        llm = scripted_tools_llm(TOOLS_CHAT_SCRIPT) if agent_mode == "tools" else scripted_llm(CHAT_SCRIPT)
+        return Sophia.create_agent(memory=memory, llm=llm, mode=agent_mode)
+
+    app_module.SOPHIA_INTENT_ROUTER = "on" if router else "off"
+    application = app_module.create_app(agent_factory=agent_factory)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, errors = [], 0
+    stub.reset_calls()
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=application), base_url="http://bench") as client:
+        async def one(i):
+            nonlocal errors
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.post("/chat/", json={
+                    "message": "¿Cuál es el estado de la red L_0?", "session_id": f"bench-{i % sessions}",
+                }, timeout=120)
+                latencies.append((time.perf_counter() - start) * 1000)
+                if response.status_code != 200:
+                    errors += 1
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(requests)))
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "sessions": sessions,
+        "errors": errors,
+        "throughput_rps": round(requests / elapsed, 2),
+        "p50_ms": round(statistics.median(latencies), 1),
+        "p95_ms": round(latencies[max(0, int(len(latencies) * 0.95) - 1)], 1),
+        "api_calls": sum(stub.snapshot_calls().values()),
+        "peak_memory_mb": round(peak / 1024 / 1024, 1),
+    }
+
+
+def compare(current, baseline, prefix=""):
+    """Imprime la variación porcentual de cada métrica numérica respecto de la corrida base."""
+    for key, value in current.items():
+        base = baseline.get(key) if isinstance(baseline, dict) else None
+        if isinstance(value, dict):
+            compare(value, base or {}, f"{prefix}{key}.")
+        elif isinstance(value, (int, float)) and isinstance(base, (int, float)) and base:
+            print(f"  {prefix}{key:<40} {base:>10} -> {value:<10} ({(value - base) / base * 100:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--networks", type=int, default=3)
+    parser.add_argument("--switches", type=int, default=4)
+    parser.add_argument("--aps", type=int, default=10)
+    parser.add_argument("--cameras", type=int, default=5)
+    parser.add_argument("--clients", type=int, default=2000)
+    parser.add_argument("--ports", type=int, default=48)
+    parser.add_argument("--latency-ms", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=32)
+    parser.add_argument("--sessions", type=int, default=8)
+    parser.add_argument("--agent-mode", choices=["tools", "react"], default="tools")
+    parser.add_argument("--skip-chat", action="store_true")
+    parser.add_argument("--output-dir", default="bench_results")
+    parser.add_argument("--compare", help="JSON de una corrida anterior para comparar")
+    args = parser.parse_args()
+
+    data = StubData(networks=args.networks, switches=args.switches, aps=args.aps,
+                    cameras=args.cameras, clients=args.clients, ports=args.ports)
+    stub = StubServer(data, latency_ms=args.latency_ms).start()
+    workdir = tempfile.mkdtemp(prefix="sophia-bench-")
+    configure_environment(stub, workdir)
+    try:
+        results = {"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "config": vars(args)}
+        print("Herramientas:")
+        results["tools"] = bench_tools(stub)
+        if not args.skip_chat:
+            for scenario, router in (("chat", False), ("chat_router", True)):
+                print(f"Chat ({'enrutador' if router else 'agente ' + args.agent_mode}):")
+                results[scenario] = asyncio.run(bench_chat(
+                    stub, args.concurrency, args.requests, args.sessions, args.agent_mode, router=router))
+                print("  " + json.dumps(results[scenario]))
+    finally:
+        stub.stop()
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    path = os.path.join(args.output_dir, f"bench-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+    print(f"Resultados guardados en {path}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"Comparación contra {args.compare}:")
+        compare({key: results.get(key, {}) for key in ("tools", "chat", "chat_router")}, baseline)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+import difflib
+import threading
+import time
+
+
+class CameraIndex:
+    """
+    Índice nombre → cámara por red. Se construye una vez por red a partir de la lista
+    de dispositivos y se reconstruye cuando pasa su TTL. La búsqueda exacta es O(1);
+    si no hay coincidencia exacta se prueba por prefijo y luego por similitud.
+    """
+
+    def __init__(self, load_devices, normalize, ttl=900):
+        self.load_devices = load_devices  # network_id -> lista de dispositivos
+        self.normalize = normalize        # nombre -> nombre limpio
+        self.ttl = ttl
+        self._networks = {}  # network_id -> (built_at, {clave: cámara})
+        self._lock = threading.Lock()
+
+    def _key(self, name):
+        return self.normalize(name).strip().lower()
+
+    def _build(self, network_id):
+        cameras = {}
+        for device in self.load_devices(network_id):
+            if not device.get("model", "").startswith("MV"):
+                continue
+            clean_name = self.normalize(device.get("name") or device.get("serial"))
+            cameras[clean_name.strip().lower()] = {
+                "name": clean_name,
+                "serial": device.get("serial"),
+                "model": device.get("model"),
+                "device": device,
+            }
+        return cameras
+
+    def cameras(self, network_id):
+        """Devuelve {clave: cámara} de la red, reconstruyéndolo si venció el TTL."""
+        with self._lock:
+            entry = self._networks.get(network_id)
+            if entry and time.monotonic() - entry[0] < self.ttl:
+                return entry[1]
+        cameras = self._build(network_id)
+        with self._lock:
+            self._networks[network_id] = (time.monotonic(), cameras)
+        return cameras
+
+    def names(self, network_id):
+        return [camera["name"] for camera in self.cameras(network_id).values()]
+
+    def lookup(self, network_id, name):
+        """Busca una cámara por nombre: exacto, luego prefijo único y luego similitud."""
+        cameras = self.cameras(network_id)
+        key = self._key(name)
+        if key in cameras:
+            return cameras[key]
+        prefixed = [k for k in cameras if k.startswith(key)]
+        if len(prefixed) == 1:
+            return cameras[prefixed[0]]
+        close = difflib.get_close_matches(key, prefixed or list(cameras), n=1, cutoff=0.75)
+        return cameras[close[0]] if close else None
+
+    def invalidate(self, network_id=None):
+        with self._lock:
+            if network_id is None:
+                self._networks.clear()
+            else:
+                self._networks.pop(network_id, None)
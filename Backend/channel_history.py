@@ -0,0 +1,191 @@
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS samples (
+    serial TEXT NOT NULL,
+    band TEXT NOT NULL,
+    network_id TEXT NOT NULL,
+    start_ts INTEGER NOT NULL,
+    end_ts INTEGER NOT NULL,
+    utilization REAL NOT NULL,
+    PRIMARY KEY (serial, band, start_ts)
+);
+CREATE TABLE IF NOT EXISTS hourly (
+    serial TEXT NOT NULL,
+    band TEXT NOT NULL,
+    network_id TEXT NOT NULL,
+    hour_ts INTEGER NOT NULL,
+    avg_utilization REAL NOT NULL,
+    max_utilization REAL NOT NULL,
+    samples INTEGER NOT NULL,
+    PRIMARY KEY (serial, band, hour_ts)
+);
+CREATE TABLE IF NOT EXISTS fetch_state (
+    serial TEXT NOT NULL,
+    band TEXT NOT NULL,
+    fetched_until INTEGER NOT NULL,
+    checked_at INTEGER NOT NULL,
+    PRIMARY KEY (serial, band)
+);
+CREATE INDEX IF NOT EXISTS idx_samples_network ON samples (network_id, start_ts);
+CREATE INDEX IF NOT EXISTS idx_hourly_network ON hourly (network_id, hour_ts);
+"""
+
+# Muestras crudas y promedios horarios con el mismo formato, para consultar ambos juntos
+SERIES = """
+SELECT serial, band, network_id, start_ts AS ts, utilization AS avg_u, utilization AS max_u, 1 AS n
+FROM samples
+UNION ALL
+SELECT serial, band, network_id, hour_ts AS ts, avg_utilization, max_utilization, samples
+FROM hourly
+"""
+
+
+def _timestamp(value):
+    """Segundos epoch desde un número o una fecha ISO 8601 de la API (p. ej. '2024-05-01T10:00:00Z')."""
+    if isinstance(value, (int, float)):
+        return int(value)
+    return int(datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp())
+
+
+def _iso(ts):
+    """Fecha ISO 8601 en UTC, como la devuelve la API, desde segundos epoch."""
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(ts))
+
+
+def _utilization(sample):
+    return float((sample.get("utilization") or {}).get("total", sample.get("utilizationTotal")) or 0)
+
+
+class ChannelUtilizationStore:
+    """
+    Serie temporal local (SQLite) de utilización de canal por AP y banda.
+    Guarda las muestras crudas de las últimas 'raw_retention' horas y las más viejas
+    las reduce a promedios/máximos por hora, que se conservan 'retention_days' días.
+    Recuerda hasta dónde se descargó cada AP (fin de su última muestra) para pedir a la API
+    solo el intervalo faltante.
+    """
+
+    def __init__(self, path="channel_history.db", raw_retention=48 * 3600, retention_days=30):
+        self.path = path
+        self.raw_retention = raw_retention
+        self.retention_days = retention_days
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------ escritura
+
+    def fetch_state(self, serial, band):
+        """
+        Retorna (fetched_until, checked_at): fin de la última muestra guardada y momento de la
+        última consulta a la API para ese AP y banda, o None si nunca se descargó.
+        """
+        with self._lock:
+            return self._conn.execute(
+                "SELECT fetched_until, checked_at FROM fetch_state WHERE serial = ? AND band = ?", (serial, band)
+            ).fetchone()
+
+    def store(self, network_id, serial, band, samples, checked_at, since=0, until=None):
+        """
+        Guarda las muestras de la API que empiezan desde 'since' (se ignoran las repetidas),
+        avanza fetched_until hasta el fin de la última muestra y registra la consulta.
+        'until' marca un intervalo ya cerrado como descargado aunque no tenga muestras
+        (p. ej. un tramo de días atrás en el que el AP estuvo apagado).
+        """
+        rows = [
+            (serial, band, network_id, _timestamp(s["startTs"]), _timestamp(s["endTs"]), _utilization(s))
+            for s in samples if s.get("startTs") is not None and s.get("endTs") is not None
+        ]
+        rows = [row for row in rows if row[3] >= since]
+        fetched_until = max([since, until or 0] + [row[4] for row in rows])
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO samples (serial, band, network_id, start_ts, end_ts, utilization) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.execute(
+                "INSERT INTO fetch_state (serial, band, fetched_until, checked_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(serial, band) DO UPDATE SET "
+                "fetched_until = MAX(fetched_until, excluded.fetched_until), checked_at = excluded.checked_at",
+                (serial, band, int(fetched_until), int(checked_at)),
+            )
+        return len(rows)
+
+    def downsample(self, now=None):
+        """Reduce a promedios horarios las muestras más viejas que raw_retention y purga lo vencido."""
+        now = now or time.time()
+        cutoff = int(now - self.raw_retention)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO hourly (serial, band, network_id, hour_ts, avg_utilization, max_utilization, samples) "
+                "SELECT serial, band, network_id, start_ts / 3600 * 3600, AVG(utilization), MAX(utilization), COUNT(*) "
+                "FROM samples WHERE start_ts < ? GROUP BY serial, band, network_id, start_ts / 3600 "
+                "ON CONFLICT(serial, band, hour_ts) DO UPDATE SET "
+                "avg_utilization = (avg_utilization * samples + excluded.avg_utilization * excluded.samples)"
+                " / (samples + excluded.samples), "
+                "max_utilization = MAX(max_utilization, excluded.max_utilization), "
+                "samples = samples + excluded.samples",
+                (cutoff,),
+            )
+            self._conn.execute("DELETE FROM samples WHERE start_ts < ?", (cutoff,))
+            self._conn.execute("DELETE FROM hourly WHERE hour_ts < ?", (int(now - self.retention_days * 86400),))
+
+    # ------------------------------------------------------------------ lectura
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def recent(self, network_id, since):
+        """
+        Muestras crudas de la red desde 'since', de mayor a menor utilización, en el formato
+        de la API (startTs/endTs como fechas ISO 8601 en UTC).
+        """
+        rows = self._query(
+            "SELECT serial, band, start_ts, end_ts, utilization FROM samples "
+            "WHERE network_id = ? AND start_ts >= ? ORDER BY utilization DESC",
+            (network_id, int(since)),
+        )
+        return [
+            {"serial": serial, "band": band, "startTs": _iso(start), "endTs": _iso(end),
+             "utilization": {"total": utilization}}
+            for serial, band, start, end, utilization in rows
+        ]
+
+    def first_timestamp(self, network_id, since):
+        """Inicio de la primera muestra (cruda u horaria) de la red desde 'since', o None si no hay datos."""
+        return self._query(
+            f"SELECT MIN(ts) FROM ({SERIES}) WHERE network_id = ? AND ts >= ?", (network_id, int(since))
+        )[0][0]
+
+    def worst_aps(self, network_id, since, limit=10):
+        """APs (y banda) con mayor utilización promedio desde 'since', con su pico."""
+        rows = self._query(
+            f"SELECT serial, band, SUM(avg_u * n) / SUM(n), MAX(max_u), SUM(n) FROM ({SERIES}) "
+            "WHERE network_id = ? AND ts >= ? GROUP BY serial, band ORDER BY 3 DESC LIMIT ?",
+            (network_id, int(since), limit),
+        )
+        return [
+            {"serial": serial, "band": band, "avg_utilization": round(avg, 1), "peak_utilization": round(peak, 1),
+             "samples": samples}
+            for serial, band, avg, peak, samples in rows
+        ]
+
+    def peak_hours(self, network_id, since, limit=5, utc_offset_hours=0):
+        """Horas del día (0-23, con 'utc_offset_hours') con mayor utilización promedio desde 'since'."""
+        offset = int(utc_offset_hours * 3600)
+        rows = self._query(
+            f"SELECT ((ts + ?) % 86400) / 3600 AS hour, SUM(avg_u * n) / SUM(n), MAX(max_u) FROM ({SERIES}) "
+            "WHERE network_id = ? AND ts >= ? GROUP BY hour ORDER BY 2 DESC LIMIT ?",
+            (offset, network_id, int(since), limit),
+        )
+        return [
+            {"hour": hour, "avg_utilization": round(avg, 1), "peak_utilization": round(peak, 1)}
+            for hour, avg, peak in rows
+        ]
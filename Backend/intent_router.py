@@ -0,0 +1,172 @@
+import importlib
+import re
+import threading
+from collections import Counter as Tally
+from answer_cache import normalize_question
+from lazy import LazyObject
+from metrics import REGISTRY, Counter
+
+ROUTER_REQUESTS = REGISTRY.register(Counter(
+    "sophia_router_requests_total", "Preguntas evaluadas por el enrutador de intenciones", ["intent", "result"]))
+
+# Las herramientas (y el SDK de Meraki) se importan recién con la primera pregunta enrutada
+_tools = LazyObject(lambda: importlib.import_module("meraki_utils"))
+
+# Fragmentos comunes de las preguntas (sobre el texto ya normalizado: minúsculas, sin tildes ni signos)
+_ASK = r"(?:(?:lista|listar|listame|muestra|muestrame|mostrar|dame|ver|cuales son|que|quiero ver)\s+)?"
+_THE = r"(?:(?:las|los|mis|todas las|todos los)\s+)?"
+_NETWORK = r"(?:de|en)\s+(?:la\s+)?red\s+([ln]_\d+)"
+_ORG = r"(?:de|en)\s+(?:la\s+)?(?:organizacion|org)\s+(\d+)"
+
+
+def _network_id(raw):
+    return raw[0].upper() + raw[1:]
+
+
+def _is_error(result):
+    return isinstance(result, dict) and "error" in result
+
+
+# ------------------------------------------------------------------ respuestas
+
+def _organizations(mu):
+    orgs = mu.list_organizations()
+    if _is_error(orgs):
+        return None
+    lines = [f"- {org.get('name')} (org_id: {org.get('id')})" for org in orgs]
+    return f"Organizaciones disponibles ({len(orgs)}):\n" + "\n".join(lines)
+
+
+def _networks(mu, org_id):
+    networks = mu.list_networks(org_id)
+    if _is_error(networks):
+        return None
+    lines = [f"- {net.get('name')} (network_id: {net.get('id')})" for net in networks]
+    return f"Redes de la organización {org_id} ({len(networks)}):\n" + "\n".join(lines)
+
+
+def _device_count(mu, network_id):
+    devices = mu.list_devices(network_id)
+    if _is_error(devices):
+        return None
+    by_type = Tally(device.get("productType") or (device.get("model") or "otro")[:2] for device in devices)
+    detail = ", ".join(f"{count} {kind}" for kind, count in by_type.most_common())
+    return f"La red {network_id} tiene {len(devices)} dispositivos" + (f": {detail}." if detail else ".")
+
+
+def _devices(mu, network_id):
+    devices = mu.list_devices(network_id)
+    if _is_error(devices):
+        return None
+    lines = [f"- {d.get('name') or d.get('serial')} ({d.get('model')}, serial {d.get('serial')})" for d in devices]
+    return f"Dispositivos de la red {network_id} ({len(devices)}):\n" + "\n".join(lines)
+
+
+def _network_status(mu, network_id):
+    report = mu.get_network_status(network_id)
+    if _is_error(report) or not isinstance(report, dict):
+        return None
+    lines = [f"- {key}: {value}" for key, value in report.items()]
+    return f"Estado de la red {network_id}:\n" + "\n".join(lines)
+
+
+def _vlans(mu, network_id):
+    vlans = mu.list_vlans(network_id)
+    if _is_error(vlans) or not isinstance(vlans, list):
+        return None
+    lines = [f"- VLAN {v.get('id')} {v.get('name')}: {v.get('subnet')}" for v in vlans]
+    return f"VLANs de la red {network_id} ({len(vlans)}):\n" + "\n".join(lines)
+
+
+def _firewall_rules(mu, network_id):
+    data = mu.list_firewall_rules(network_id)
+    if _is_error(data) or not isinstance(data, dict):
+        return None
+    rules = data.get("rules", [])
+    lines = [
+        f"- {r.get('policy')} {r.get('protocol')} {r.get('srcCidr')} -> {r.get('destCidr')}:{r.get('destPort')}"
+        f" ({r.get('comment')})"
+        for r in rules
+    ]
+    return f"Reglas de firewall de la red {network_id} ({len(rules)}):\n" + "\n".join(lines)
+
+
+def _subscription(mu, org_id):
+    result = mu.get_subscription_end_date(org_id)
+    if _is_error(result):
+        return None
+    return f"La suscripción de la organización {org_id} vence el {result.get('expirationDate')}."
+
+
+# (nombre, patrón completo sobre la pregunta normalizada, función de respuesta)
+INTENTS = [
+    ("organizations", rf"{_ASK}{_THE}organizaciones(?:\s+(?:tengo|hay|disponibles))?", _organizations),
+    ("networks", rf"{_ASK}{_THE}redes\s+{_ORG}", _networks),
+    ("device_count", rf"cuantos\s+(?:dispositivos|equipos)\s+hay\s+{_NETWORK}", _device_count),
+    ("device_count", r"cuantos\s+(?:dispositivos|equipos)\s+tiene\s+la\s+red\s+([ln]_\d+)", _device_count),
+    ("devices", rf"{_ASK}{_THE}(?:dispositivos|equipos)\s+{_NETWORK}", _devices),
+    ("network_status", rf"(?:cual es\s+|como esta\s+)?(?:el\s+)?estado\s+{_NETWORK}", _network_status),
+    ("vlans", rf"{_ASK}{_THE}vlans?\s+{_NETWORK}", _vlans),
+    ("firewall_rules", rf"{_ASK}{_THE}reglas\s+(?:de\s+)?firewall\s+{_NETWORK}", _firewall_rules),
+    ("subscription", rf"(?:cuando vence|fecha de vencimiento de|vencimiento de)\s+(?:la\s+)?"
+                     rf"(?:suscripcion|licencia)\s+{_ORG}", _subscription),
+]
+
+
+class IntentRouter:
+    """
+    Enrutador determinista delante del agente: reconoce preguntas frecuentes en español
+    con IDs explícitos, llama directo a la función de meraki_utils y arma la respuesta
+    sin el LLM. Si la pregunta no coincide por completo con un patrón o la herramienta
+    devuelve un error, retorna None y la pregunta sigue al agente.
+    """
+
+    def __init__(self, intents=INTENTS):
+        self.intents = [(name, re.compile(pattern), handler) for name, pattern, handler in intents]
+        self.hits = 0
+        self.fallbacks = 0
+        self._lock = threading.Lock()  # answer() corre en el threadpool de FastAPI
+
+    def match(self, question):
+        """Retorna (intención, función, argumentos) o None."""
+        text = normalize_question(question)
+        for name, pattern, handler in self.intents:
+            match = pattern.fullmatch(text)
+            if match:
+                args = [_network_id(arg) if re.fullmatch(r"[ln]_\d+", arg) else arg for arg in match.groups()]
+                return name, handler, args
+        return None
+
+    def answer(self, question):
+        """Responde la pregunta sin el LLM, o None si hay que usar el agente."""
+        matched = self.match(question)
+        if matched is None:
+            self._count(None)
+            ROUTER_REQUESTS.inc("none", "fallback")
+            return None
+        name, handler, args = matched
+        try:
+            answer = handler(_tools.load(), *args)
+        except Exception as e:
+            print(f"⚠ Error en el enrutador ({name}), se usa el agente: {e}")
+            answer = None
+        self._count(answer)
+        ROUTER_REQUESTS.inc(name, "hit" if answer is not None else "fallback")
+        return answer
+
+    def _count(self, answer):
+        with self._lock:
+            if answer is None:
+                self.fallbacks += 1
+            else:
+                self.hits += 1
+
+    def stats(self):
+        with self._lock:
+            hits, fallbacks = self.hits, self.fallbacks
+        total = hits + fallbacks
+        return {
+            "hits": hits,
+            "fallbacks": fallbacks,
+            "hit_rate": round(hits / total, 3) if total else 0.0,
+        }
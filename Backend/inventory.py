@@ -0,0 +1,228 @@
+import json
+import sqlite3
+import threading
+import time
+from meraki_scheduler import BACKGROUND, priority
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS organizations (
+    id TEXT PRIMARY KEY,
+    name TEXT,
+    data TEXT NOT NULL,
+    synced_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS networks (
+    id TEXT PRIMARY KEY,
+    organization_id TEXT NOT NULL,
+    name TEXT,
+    data TEXT NOT NULL,
+    synced_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS devices (
+    serial TEXT PRIMARY KEY,
+    organization_id TEXT NOT NULL,
+    network_id TEXT,
+    name TEXT,
+    model TEXT,
+    data TEXT NOT NULL,
+    synced_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    scope TEXT PRIMARY KEY,
+    synced_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_networks_org ON networks (organization_id);
+CREATE INDEX IF NOT EXISTS idx_networks_name ON networks (name COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_devices_network ON devices (network_id);
+CREATE INDEX IF NOT EXISTS idx_devices_name ON devices (name COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_devices_model ON devices (model);
+"""
+
+
+class InventoryIndex:
+    """
+    Índice local (SQLite) de organizaciones, redes y dispositivos de Meraki.
+    Guarda el JSON original de cada objeto para devolverlo con la misma forma que la API.
+    """
+
+    def __init__(self, path="inventory.db"):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------ escritura
+
+    def _replace(self, table, key_column, rows, scope_column=None, scope=None):
+        """
+        Inserta/actualiza 'rows' (dicts con las columnas de la tabla) y elimina las filas
+        del mismo ámbito que ya no existen en el Dashboard.
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            if rows:
+                columns = list(rows[0].keys()) + ["synced_at"]
+                placeholders = ", ".join("?" for _ in columns)
+                updates = ", ".join(f"{c} = excluded.{c}" for c in columns if c != key_column)
+                self._conn.executemany(
+                    f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders}) "
+                    f"ON CONFLICT({key_column}) DO UPDATE SET {updates}",
+                    [list(row.values()) + [now] for row in rows],
+                )
+            if scope_column is None:
+                self._conn.execute(f"DELETE FROM {table} WHERE synced_at < ?", (now,))
+            else:
+                self._conn.execute(
+                    f"DELETE FROM {table} WHERE {scope_column} = ? AND synced_at < ?", (scope, now)
+                )
+
+    def mark_synced(self, scope):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO sync_state (scope, synced_at) VALUES (?, ?) "
+                "ON CONFLICT(scope) DO UPDATE SET synced_at = excluded.synced_at",
+                (scope, time.time()),
+            )
+
+    def store_organizations(self, organizations):
+        self._replace("organizations", "id", [
+            {"id": str(org["id"]), "name": org.get("name"), "data": json.dumps(org)}
+            for org in organizations
+        ])
+        self.mark_synced("organizations")
+
+    def store_networks(self, org_id, networks):
+        self._replace("networks", "id", [
+            {"id": net["id"], "organization_id": str(org_id), "name": net.get("name"), "data": json.dumps(net)}
+            for net in networks
+        ], scope_column="organization_id", scope=str(org_id))
+
+    def store_devices(self, org_id, devices):
+        self._replace("devices", "serial", [
+            {
+                "serial": dev["serial"],
+                "organization_id": str(org_id),
+                "network_id": dev.get("networkId"),
+                "name": dev.get("name"),
+                "model": dev.get("model"),
+                "data": json.dumps(dev),
+            }
+            for dev in devices
+        ], scope_column="organization_id", scope=str(org_id))
+
+    # ------------------------------------------------------------------ lectura
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def synced_at(self, scope):
+        rows = self._query("SELECT synced_at FROM sync_state WHERE scope = ?", (scope,))
+        return rows[0][0] if rows else None
+
+    def oldest_sync(self, prefix=""):
+        """Momento de la sincronización más antigua entre los alcances que empiezan con 'prefix'."""
+        rows = self._query("SELECT MIN(synced_at) FROM sync_state WHERE scope LIKE ?", (prefix + "%",))
+        return rows[0][0] if rows else None
+
+    def is_fresh(self, scope, max_age):
+        synced_at = self.synced_at(scope)
+        return synced_at is not None and time.time() - synced_at <= max_age
+
+    def organizations(self):
+        return [json.loads(row[0]) for row in self._query("SELECT data FROM organizations ORDER BY name")]
+
+    def networks(self, org_id):
+        return [json.loads(row[0]) for row in self._query(
+            "SELECT data FROM networks WHERE organization_id = ? ORDER BY name", (str(org_id),)
+        )]
+
+    def network_org_id(self, network_id):
+        rows = self._query("SELECT organization_id FROM networks WHERE id = ?", (network_id,))
+        return rows[0][0] if rows else None
+
+    def device_org_id(self, serial):
+        rows = self._query("SELECT organization_id FROM devices WHERE serial = ?", (serial,))
+        return rows[0][0] if rows else None
+
+    def devices(self, network_id):
+        return [json.loads(row[0]) for row in self._query(
+            "SELECT data FROM devices WHERE network_id = ? ORDER BY name", (network_id,)
+        )]
+
+    def find_devices(self, name=None, serial=None, model=None, network_id=None, limit=50):
+        """Búsqueda por prefijo de nombre, serial o modelo (sin distinguir mayúsculas en el nombre)."""
+        clauses, params = [], []
+        if name:
+            clauses.append("name LIKE ? COLLATE NOCASE")
+            params.append(f"{name}%")
+        if serial:
+            clauses.append("serial LIKE ?")
+            params.append(f"{serial.upper()}%")
+        if model:
+            clauses.append("model LIKE ?")
+            params.append(f"{model.upper()}%")
+        if network_id:
+            clauses.append("network_id = ?")
+            params.append(network_id)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._query(f"SELECT data FROM devices {where} ORDER BY name LIMIT ?", (*params, limit))
+        return [json.loads(row[0]) for row in rows]
+
+
+class InventorySync:
+    """
+    Sincroniza el índice en segundo plano. En cada ciclo refresca la lista de
+    organizaciones y luego, de una en una, las organizaciones cuya última
+    sincronización es más antigua que 'interval' (refresco incremental).
+    """
+
+    def __init__(self, index, dashboard, interval=900):
+        # 'dashboard' debe ser el cliente sin caché, para que cada ciclo traiga datos frescos
+        self.index = index
+        self.dashboard = dashboard
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def sync_organization(self, org_id):
+        networks = self.dashboard.organizations.getOrganizationNetworks(org_id, total_pages="all")
+        devices = self.dashboard.organizations.getOrganizationDevices(org_id, total_pages="all")
+        self.index.store_networks(org_id, networks)
+        self.index.store_devices(org_id, devices)
+        self.index.mark_synced(f"org:{org_id}")
+
+    def sync_once(self):
+        if self.index.is_fresh("organizations", self.interval):
+            organizations = self.index.organizations()
+        else:
+            organizations = self.dashboard.organizations.getOrganizations()
+            self.index.store_organizations(organizations)
+        for org in organizations:
+            org_id = str(org["id"])
+            if self.index.is_fresh(f"org:{org_id}", self.interval):
+                continue
+            try:
+                self.sync_organization(org_id)
+            except Exception as e:
+                print(f"❌ Error sincronizando inventario de la organización {org_id}: {e}")
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                # La sincronización cede el paso a las consultas interactivas del chat
+                with priority(BACKGROUND):
+                    self.sync_once()
+            except Exception as e:
+                print(f"❌ Error sincronizando inventario: {e}")
+            self._stop.wait(min(self.interval, 60))
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="inventory-sync", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
@@ -0,0 +1,27 @@
+import threading
+
+
+class LazyObject:
+    """
+    Proxy que construye el objeto real con 'factory' la primera vez que se usa
+    (acceso a cualquier atributo o llamada a load()). Seguro para varios hilos.
+    """
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._obj = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        if self._obj is None:
+            with self._lock:
+                if self._obj is None:
+                    self._obj = self._factory()
+        return self._obj
+
+    @property
+    def loaded(self):
+        return self._obj is not None
+
+    def __getattr__(self, name):
+        return getattr(self.load(), name)
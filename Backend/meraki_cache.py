@@ -0,0 +1,291 @@
+import contextvars
+import copy
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+# TTL (segundos) por endpoint del Dashboard. Inventario largo, estado corto.
+# Los endpoints que no aparecen aquí no se cachean (p. ej. generateDeviceCameraSnapshot).
+DEFAULT_TTLS = {
+    "organizations.getOrganizations": 3600,
+    "organizations.getOrganizationNetworks": 3600,
+    "organizations.getOrganizationLicensesOverview": 3600,
+    "networks.getNetwork": 3600,
+    "networks.getNetworkDevices": 900,
+    "appliance.getNetworkApplianceVlans": 600,
+    "appliance.getNetworkApplianceFirewallL3FirewallRules": 600,
+    "networks.getNetworkClients": 60,
+    "networks.getNetworkClientsOverview": 60,
+    "organizations.getOrganizationDevicesStatuses": 60,
+    "switch.getDeviceSwitchPortsStatuses": 60,
+    "switch.getOrganizationSwitchPortsStatusesBySwitch": 60,
+}
+
+
+class TTLCache:
+    """
+    Caché en memoria acotada por tamaño, con expiración por entrada (TTL) y
+    desalojo LRU. Es segura para usarse desde varios hilos.
+    """
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._data = OrderedDict()  # key -> (expires_at, value, stamp)
+        self._stamps = itertools.count(1)  # Cada set recibe un sello nuevo
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Retorna (True, valor) si la clave está vigente, o (False, None) en caso contrario."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return False, None
+            expires_at, value, _ = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return False, None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return True, value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value, next(self._stamps))
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def stamp(self, key):
+        """
+        Retorna (sello, expires_at) de la entrada vigente, o None si no está.
+        El sello cambia cada vez que la entrada se vuelve a guardar, así que sirve
+        para saber si un dato derivado de ella sigue correspondiendo al mismo valor.
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                return None
+            return entry[2], entry[0]
+
+    def invalidate(self, predicate=None):
+        """
+        Elimina las entradas cuya clave cumpla 'predicate'. Sin predicado vacía la caché.
+        Retorna la cantidad de entradas eliminadas.
+        """
+        with self._lock:
+            if predicate is None:
+                removed = len(self._data)
+                self._data.clear()
+                return removed
+            keys = [key for key in self._data if predicate(key)]
+            for key in keys:
+                del self._data[key]
+            return len(keys)
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            }
+
+
+class Dependencies:
+    """
+    Entradas de la caché del Dashboard leídas dentro de record_dependencies().
+    'uncacheable' queda en True si hubo llamadas sin caché (escrituras, snapshots...) o
+    lecturas que fallaron.
+    'deadline' es el vencimiento de los datos leídos sin guardarse en la caché (paginaciones).
+    """
+
+    def __init__(self):
+        self.entries = {}  # key -> (cache, sello, expires_at)
+        self.uncacheable = False
+        self.deadline = None
+        self._lock = threading.Lock()
+
+    def add(self, cache, key):
+        info = cache.stamp(key)
+        with self._lock:
+            if info is None:
+                self.uncacheable = True
+            else:
+                self.entries[key] = (cache, *info)
+
+    def add_deadline(self, ttl):
+        """Dato leído sin pasar por la caché que se considera vigente 'ttl' segundos."""
+        deadline = time.monotonic() + ttl
+        with self._lock:
+            self.deadline = deadline if self.deadline is None else min(self.deadline, deadline)
+
+    def expires_at(self):
+        """Momento (time.monotonic) en que vence la primera de las entradas, o None si no hay."""
+        with self._lock:
+            expirations = [expires_at for _, _, expires_at in self.entries.values()]
+            if self.deadline is not None:
+                expirations.append(self.deadline)
+            return min(expirations, default=None)
+
+    def is_current(self):
+        """True mientras ninguna entrada haya vencido, sido invalidada o reemplazada."""
+        with self._lock:
+            entries = list(self.entries.items())
+            if self.deadline is not None and self.deadline <= time.monotonic():
+                return False
+        for key, (cache, stamp, _) in entries:
+            info = cache.stamp(key)
+            if info is None or info[0] != stamp:
+                return False
+        return True
+
+
+_dependencies = contextvars.ContextVar("meraki_dependencies", default=None)
+
+
+@contextmanager
+def record_dependencies():
+    """
+    Registra qué datos del Dashboard usa el bloque (incluidos los hilos que copian el
+    contexto, como fan_out o las herramientas de LangChain). Produce un Dependencies.
+    """
+    dependencies = Dependencies()
+    token = _dependencies.set(dependencies)
+    try:
+        yield dependencies
+    finally:
+        _dependencies.reset(token)
+
+
+def record_deadline(ttl):
+    """
+    Registra en la respuesta en curso un dato leído fuera de la caché del Dashboard
+    (paginaciones, índice de inventario, serie de canales) vigente 'ttl' segundos.
+    Con ttl None la respuesta queda como no cacheable.
+    """
+    dependencies = _dependencies.get()
+    if dependencies is None:
+        return
+    if ttl is None:
+        dependencies.uncacheable = True
+    else:
+        dependencies.add_deadline(ttl)
+
+
+def make_key(endpoint, args, kwargs):
+    """Construye una clave estable a partir del endpoint y sus argumentos."""
+    return (endpoint, repr(args), repr(sorted(kwargs.items())))
+
+
+class _CachedSection:
+    """Envuelve una sección del SDK (organizations, networks, ...) del DashboardAPI."""
+
+    def __init__(self, owner, name, section):
+        self._owner = owner
+        self._name = name
+        self._section = section
+
+    def __getattr__(self, method_name):
+        method = getattr(self._section, method_name)
+        endpoint = f"{self._name}.{method_name}"
+        ttl = self._owner.ttls.get(endpoint)
+        if not callable(method):
+            return method
+        if ttl is None:
+            def uncached_call(*args, **kwargs):
+                dependencies = _dependencies.get()
+                if dependencies is not None:
+                    dependencies.uncacheable = True
+                return method(*args, **kwargs)
+
+            return uncached_call
+
+        def cached_call(*args, **kwargs):
+            return self._owner.call(endpoint, method, ttl, *args, **kwargs)
+
+        return cached_call
+
+
+class CachedDashboard:
+    """
+    Caché de lectura (read-through) delante de un meraki.DashboardAPI.
+    Se usa igual que el cliente original: dashboard.networks.getNetworkDevices(network_id).
+    Los valores se copian al entrar y salir para que quien llama pueda modificarlos.
+    """
+
+    def __init__(self, dashboard, ttls=None, max_entries=1024):
+        self.client = dashboard  # Cliente original, sin caché
+        self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self.cache = TTLCache(max_entries=max_entries)
+
+    def __getattr__(self, name):
+        section = getattr(self.client, name)
+        if name.startswith("_") or callable(section):
+            return section
+        return _CachedSection(self, name, section)
+
+    def call(self, endpoint, method, ttl, *args, **kwargs):
+        key = make_key(endpoint, args, kwargs)
+        dependencies = _dependencies.get()
+        hit, value = self.cache.get(key)
+        if hit:
+            if dependencies is not None:
+                dependencies.add(self.cache, key)
+            return copy.deepcopy(value)
+        try:
+            value = method(*args, **kwargs)
+        except Exception:
+            # Una respuesta armada con una lectura fallida no debe reutilizarse
+            if dependencies is not None:
+                dependencies.uncacheable = True
+            raise
+        self.cache.set(key, copy.deepcopy(value), ttl)
+        if dependencies is not None:
+            dependencies.add(self.cache, key)
+        return value
+
+    def call_uncached(self, endpoint, *args, **kwargs):
+        """
+        Llama al endpoint ("networks.getNetworkClients") con el cliente original, sin guardar
+        el resultado: para paginaciones que se recorren una sola vez y no deben quedar en memoria.
+        Igual registra el TTL del endpoint como dependencia de la respuesta en curso
+        (o la marca como no cacheable si la llamada falla).
+        """
+        record_deadline(self.ttls.get(endpoint))
+        dependencies = _dependencies.get()
+        section, method_name = endpoint.split(".", 1)
+        try:
+            return getattr(getattr(self.client, section), method_name)(*args, **kwargs)
+        except Exception:
+            if dependencies is not None:
+                dependencies.uncacheable = True
+            raise
+
+    def invalidate(self, endpoint=None, *args, **kwargs):
+        """
+        Invalida entradas de la caché:
+        - sin argumentos: toda la caché;
+        - solo endpoint ("networks.getNetworkDevices"): todas las llamadas a ese endpoint;
+        - endpoint y argumentos: únicamente esa llamada.
+        """
+        if endpoint is None:
+            return self.cache.invalidate()
+        if args or kwargs:
+            target = make_key(endpoint, args, kwargs)
+            return self.cache.invalidate(lambda key: key == target)
+        return self.cache.invalidate(lambda key: key[0] == endpoint)
+
+    def stats(self):
+        return self.cache.stats()
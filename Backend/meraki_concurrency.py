@@ -0,0 +1,27 @@
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+
+def fan_out(func, items, max_workers=8):
+    """
+    Ejecuta func(item) para cada item en un pool de hilos acotado. El límite de
+    solicitudes al Dashboard lo aplica meraki_scheduler en cada llamada.
+    Retorna (resultados, errores): listas de (item, resultado) y (item, excepción),
+    ambas en el mismo orden que 'items', para que los fallos parciales no
+    descarten los resultados correctos.
+    """
+    items = list(items)
+    if not items:
+        return [], []
+
+    results, errors = [], []
+    workers = max(1, min(max_workers, len(items)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        # Cada tarea corre con una copia del contexto de quien llama (contextvars)
+        futures = [executor.submit(contextvars.copy_context().run, func, item) for item in items]
+        for item, future in zip(items, futures):
+            try:
+                results.append((item, future.result()))
+            except Exception as e:
+                errors.append((item, e))
+    return results, errors
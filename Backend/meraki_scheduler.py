@@ -0,0 +1,221 @@
+import contextvars
+import copy
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from meraki_cache import make_key
+
+# Clases de prioridad: el chat interactivo siempre pasa antes que la sincronización en segundo plano
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+
+_priority = contextvars.ContextVar("meraki_priority", default=INTERACTIVE)
+
+
+class RateLimiter:
+    """
+    Token bucket seguro para hilos. Meraki permite ~10 solicitudes por segundo
+    por organización; 'rate' son tokens por segundo y 'burst' la capacidad máxima.
+    """
+
+    def __init__(self, rate=10.0, burst=None):
+        self.rate = float(rate)
+        self.capacity = float(burst if burst is not None else rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_acquire(self):
+        """
+        Consume un token si hay uno disponible y retorna 0; si no, retorna los
+        segundos que faltan para que haya uno (sin consumir nada).
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0
+            return (1 - self._tokens) / self.rate
+
+
+@contextmanager
+def priority(level):
+    """Ejecuta el bloque con la prioridad indicada para todas las llamadas al Dashboard."""
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class MerakiScheduler:
+    """
+    Planificador central de solicitudes al Dashboard de Meraki:
+    - un token bucket por organización (Meraki limita ~10 req/s por organización);
+    - las solicitudes BACKGROUND esperan mientras haya solicitudes INTERACTIVE en cola;
+    - las lecturas idénticas en curso se unifican (una sola llamada, varios receptores);
+    - métricas de profundidad de cola y tiempo de espera por prioridad.
+    """
+
+    def __init__(self, rate=10.0, burst=None):
+        self.rate = rate
+        self.burst = burst
+        self._buckets = {}
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._cond = threading.Condition()
+        self._waiting = {INTERACTIVE: 0, BACKGROUND: 0}
+        self._stats = {
+            level: {"requests": 0, "wait_total_s": 0.0, "wait_max_s": 0.0, "max_queue_depth": 0}
+            for level in (INTERACTIVE, BACKGROUND)
+        }
+        self.coalesced = 0
+        self.requests_by_org = {}
+
+    def _bucket(self, org_id):
+        with self._lock:
+            bucket = self._buckets.get(org_id)
+            if bucket is None:
+                bucket = self._buckets[org_id] = RateLimiter(rate=self.rate, burst=self.burst)
+            return bucket
+
+    def _acquire(self, org_id, level):
+        bucket = self._bucket(org_id)
+        started = time.monotonic()
+        with self._cond:
+            self._waiting[level] += 1
+            stats = self._stats[level]
+            stats["max_queue_depth"] = max(stats["max_queue_depth"], self._waiting[level])
+        try:
+            while True:
+                with self._cond:
+                    if level == BACKGROUND and self._waiting[INTERACTIVE]:
+                        self._cond.wait(0.05)
+                        continue
+                    wait = bucket.try_acquire()
+                    if not wait:
+                        break
+                    self._cond.wait(wait)
+        finally:
+            waited = time.monotonic() - started
+            with self._cond:
+                self._waiting[level] -= 1
+                stats = self._stats[level]
+                stats["requests"] += 1
+                stats["wait_total_s"] += waited
+                stats["wait_max_s"] = max(stats["wait_max_s"], waited)
+                self.requests_by_org[org_id] = self.requests_by_org.get(org_id, 0) + 1
+                self._cond.notify_all()
+
+    def call(self, org_id, key, fn, *args, **kwargs):
+        """
+        Ejecuta fn(*args, **kwargs) cuando el bucket de la organización lo permite.
+        Si 'key' no es None y ya hay una llamada en curso con la misma clave, espera
+        su resultado en lugar de repetirla.
+        """
+        if key is None:
+            self._acquire(org_id, _priority.get())
+            return fn(*args, **kwargs)
+
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+            else:
+                self.coalesced += 1
+        if not owner:
+            return copy.deepcopy(future.result())
+
+        try:
+            self._acquire(org_id, _priority.get())
+            result = fn(*args, **kwargs)
+            future.set_result(result)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+        return copy.deepcopy(result)
+
+    def stats(self):
+        with self._cond:
+            by_priority = {}
+            for level, stats in self._stats.items():
+                requests = stats["requests"]
+                by_priority[level] = {
+                    "queue_depth": self._waiting[level],
+                    "max_queue_depth": stats["max_queue_depth"],
+                    "requests": requests,
+                    "wait_avg_ms": round(stats["wait_total_s"] / requests * 1000, 1) if requests else 0.0,
+                    "wait_max_ms": round(stats["wait_max_s"] * 1000, 1),
+                }
+            return {
+                "priorities": by_priority,
+                "coalesced": self.coalesced,
+                "requests_by_org": dict(self.requests_by_org),
+            }
+
+
+def _observed(method, endpoint, observer):
+    """Mide solo la llamada real al SDK (sin la espera en el planificador)."""
+
+    def call(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            result = method(*args, **kwargs)
+        except Exception as e:
+            observer(endpoint, time.perf_counter() - started, e)
+            raise
+        observer(endpoint, time.perf_counter() - started)
+        return result
+
+    return call
+
+
+class _ScheduledSection:
+    def __init__(self, owner, name, section):
+        self._owner = owner
+        self._name = name
+        self._section = section
+
+    def __getattr__(self, method_name):
+        method = getattr(self._section, method_name)
+        if not callable(method):
+            return method
+        endpoint = f"{self._name}.{method_name}"
+        owner = self._owner
+        if owner.observer is not None:
+            method = _observed(method, endpoint, owner.observer)
+
+        def scheduled_call(*args, **kwargs):
+            org_id = owner.resolve_org(method_name, args, kwargs) or "default"
+            # Solo se unifican lecturas; las escrituras (generate/create/update...) nunca
+            key = make_key(endpoint, args, kwargs) if method_name.startswith("get") else None
+            return owner.scheduler.call(org_id, key, method, *args, **kwargs)
+
+        return scheduled_call
+
+
+class ScheduledDashboard:
+    """
+    Envuelve un meraki.DashboardAPI para que todas sus llamadas pasen por el planificador.
+    'resolve_org(method_name, args, kwargs)' devuelve la organización de cada llamada.
+    Si se indica 'observer(endpoint, segundos, error=None)', se le informa cada llamada al SDK.
+    """
+
+    def __init__(self, dashboard, scheduler, resolve_org, observer=None):
+        self.client = dashboard
+        self.scheduler = scheduler
+        self.resolve_org = resolve_org
+        self.observer = observer
+
+    def __getattr__(self, name):
+        section = getattr(self.client, name)
+        if name.startswith("_") or callable(section):
+            return section
+        return _ScheduledSection(self, name, section)
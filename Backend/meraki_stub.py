@@ -0,0 +1,292 @@
+"""
+Servidor local que imita los endpoints del Dashboard de Meraki que usa meraki_utils,
+para medir sin tocar la API real. La cantidad de redes, dispositivos, clientes y puertos
+y la latencia por solicitud son configurables. Cuenta las llamadas por endpoint.
+
+Uso directo: python meraki_stub.py --port 8900 --clients 5000 --latency-ms 80
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlparse
+
+API_PREFIX = "/api/v1"
+
+# Parámetros que acepta la API real en channelUtilizationHistory y resoluciones válidas
+CHANNEL_PARAMS = {"t0", "t1", "timespan", "resolution", "autoResolution", "clientId", "deviceSerial", "apTag", "band"}
+CHANNEL_RESOLUTIONS = {600, 1200, 3600, 14400, 86400}
+
+
+def _iso(ts):
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(ts))
+
+
+def _epoch(value):
+    """Segundos epoch desde un número o una fecha ISO 8601 ('2024-05-01T10:00:00Z')."""
+    try:
+        return int(float(value))
+    except ValueError:
+        return int(datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp())
+
+
+class StubError(Exception):
+    """Error de validación que el servidor responde con 'status' y el formato de errores de Meraki."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class StubData:
+    """Inventario sintético y determinista (misma semilla, mismos datos)."""
+
+    def __init__(self, networks=3, switches=4, aps=10, cameras=5, clients=2000, ports=48, seed=7):
+        rng = random.Random(seed)
+        self.org = {"id": "1", "name": "Organización Benchmark"}
+        self.networks = []
+        self.devices = {}
+        self.clients = {}
+        self.ports = {}
+        for n in range(networks):
+            net_id = f"L_{n}"
+            self.networks.append({
+                "id": net_id, "organizationId": "1", "name": f"Sede {n}",
+                "productTypes": ["appliance", "switch", "wireless", "camera"],
+            })
+            devices = []
+            for kind, model, count in (("SW", "MS225-48", switches), ("AP", "MR46", aps), ("CAM", "MV12", cameras)):
+                for i in range(count):
+                    serial = f"Q{n}{kind}-{i:04d}"
+                    devices.append({
+                        "serial": serial, "name": f"{kind}-{n}-{i}", "model": model, "networkId": net_id,
+                        "productType": {"SW": "switch", "AP": "wireless", "CAM": "camera"}[kind],
+                        "lanIp": f"10.{n}.0.{i + 1}", "lat": 0, "lng": 0, "address": "", "tags": [],
+                        "url": "", "details": [],
+                    })
+                    if kind == "SW":
+                        self.ports[serial] = [
+                            {"portId": str(p + 1), "status": "Connected", "enabled": True,
+                             "usageInKb": {"total": rng.randint(0, 3_000_000)}}
+                            for p in range(ports)
+                        ]
+            self.devices[net_id] = devices
+            self.clients[net_id] = [
+                {
+                    "id": f"k{n}-{i:06d}", "mac": f"00:11:22:{n:02x}:{i // 256 % 256:02x}:{i % 256:02x}",
+                    "ip": f"10.{n}.{i // 250 % 250}.{i % 250 + 1}", "description": f"cliente-{i}",
+                    "vlan": 10 * (i % 4 + 1), "ssid": ["Corp", "Invitados", None][i % 3],
+                    "os": ["Windows 11", "iOS", "Android", "macOS"][i % 4],
+                    "manufacturer": ["Apple", "Dell", "Samsung", "Lenovo"][i % 4],
+                    "status": "Online", "lastSeen": 0,
+                    "usage": {"sent": 0, "recv": 0, "total": rng.randint(0, 5_000_000)},
+                }
+                for i in range(clients)
+            ]
+
+    def all_devices(self):
+        return [device for devices in self.devices.values() for device in devices]
+
+
+class StubServer:
+    def __init__(self, data=None, latency_ms=50, host="127.0.0.1", port=0):
+        self.data = data or StubData()
+        self.latency_ms = latency_ms
+        self.calls = Counter()
+        self._snapshot_polls = Counter()
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}{API_PREFIX}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def reset_calls(self):
+        with self._lock:
+            self.calls.clear()
+
+    def snapshot_calls(self):
+        with self._lock:
+            return dict(self.calls)
+
+    # ------------------------------------------------------------------ rutas
+
+    def _routes(self):
+        d = self.data
+        return [
+            ("GET", r"/organizations", lambda m, q: [d.org]),
+            ("GET", r"/organizations/(\w+)/networks", lambda m, q: d.networks),
+            ("GET", r"/organizations/(\w+)/devices", lambda m, q: d.all_devices()),
+            ("GET", r"/organizations/(\w+)/devices/statuses", self._device_statuses),
+            ("GET", r"/organizations/(\w+)/licenses/overview", lambda m, q: {"expirationDate": "Dec 31, 2030 UTC"}),
+            ("GET", r"/organizations/(\w+)/switch/ports/statuses/bySwitch", self._ports_by_switch),
+            ("GET", r"/networks/(\w+)", lambda m, q: next(n for n in d.networks if n["id"] == m.group(1))),
+            ("GET", r"/networks/(\w+)/devices", lambda m, q: d.devices[m.group(1)]),
+            ("GET", r"/networks/(\w+)/clients", self._clients),
+            ("GET", r"/networks/(\w+)/clients/overview",
+             lambda m, q: {"counts": {"total": len(d.clients[m.group(1)])}}),
+            ("GET", r"/networks/(\w+)/wireless/channelUtilizationHistory", self._channel_utilization),
+            ("GET", r"/networks/(\w+)/appliance/vlans", lambda m, q: [
+                {"id": 10 * (i + 1), "name": f"VLAN {i + 1}", "subnet": f"10.{i}.0.0/24", "applianceIp": f"10.{i}.0.1"}
+                for i in range(4)
+            ]),
+            ("GET", r"/networks/(\w+)/appliance/firewall/l3FirewallRules", lambda m, q: {"rules": [
+                {"comment": "Bloquear invitados", "policy": "deny", "protocol": "any",
+                 "srcCidr": "10.2.0.0/24", "destCidr": "10.0.0.0/8", "destPort": "Any"},
+                {"comment": "Default rule", "policy": "allow", "protocol": "Any",
+                 "srcCidr": "Any", "destCidr": "Any", "destPort": "Any"},
+            ]}),
+            ("GET", r"/devices/([\w-]+)/switch/ports/statuses", lambda m, q: d.ports.get(m.group(1), [])),
+            ("POST", r"/devices/([\w-]+)/camera/generateSnapshot", self._generate_snapshot),
+        ]
+
+    def _device_statuses(self, match, query):
+        network_ids = query.get("networkIds[]") or query.get("networkIds")
+        return [
+            {"serial": dev["serial"], "networkId": dev["networkId"], "productType": dev["productType"],
+             "status": "offline" if i % 17 == 0 else "online"}
+            for i, dev in enumerate(self.data.all_devices())
+            if not network_ids or dev["networkId"] in network_ids
+        ]
+
+    def _ports_by_switch(self, match, query):
+        network_ids = query.get("networkIds[]") or query.get("networkIds")
+        return [
+            {"serial": dev["serial"], "name": dev["name"], "model": dev["model"],
+             "network": {"id": dev["networkId"], "name": dev["networkId"]}, "ports": self.data.ports[dev["serial"]]}
+            for dev in self.data.all_devices()
+            if dev["serial"] in self.data.ports and (not network_ids or dev["networkId"] in network_ids)
+        ]
+
+    def _clients(self, match, query):
+        clients = self.data.clients[match.group(1)]
+        per_page = int(query.get("perPage", ["10"])[0])
+        after = query.get("startingAfter", [None])[0]
+        start = 0
+        if after:
+            start = next((i + 1 for i, c in enumerate(clients) if c["id"] == after), len(clients))
+        page = clients[start:start + per_page]
+        links = None
+        if start + per_page < len(clients) and page:
+            links = {"perPage": per_page, "startingAfter": page[-1]["id"]}
+        return page, links
+
+    def _channel_utilization(self, match, query):
+        # Valida como la API real: parámetros conocidos, deviceSerial solo junto con band o
+        # clientId, y resolución diaria si no se indica. Devuelve los intervalos completos
+        # entre t0 y t1 (o los últimos 'timespan', 7 días por defecto), deterministas por intervalo.
+        unknown = sorted(set(query) - CHANNEL_PARAMS)
+        if unknown:
+            raise StubError(400, f"Parámetros desconocidos: {unknown}")
+        serial = query.get("deviceSerial", [None])[0]
+        band = query.get("band", [None])[0]
+        if serial and not (band or "clientId" in query):
+            raise StubError(400, "deviceSerial requiere band o clientId")
+        if band is not None and band not in ("2.4", "5", "6"):
+            raise StubError(400, f"Banda inválida: {band}")
+        resolution = int(query.get("resolution", ["86400"])[0])
+        if resolution not in CHANNEL_RESOLUTIONS:
+            raise StubError(400, f"Resolución inválida: {resolution}")
+        now = int(time.time())
+        t1 = _epoch(query.get("t1", [now])[0])
+        t0 = _epoch(query.get("t0", [t1 - int(query.get("timespan", ["604800"])[0])])[0])
+        start = -(-t0 // resolution) * resolution
+        return [
+            {"startTs": _iso(ts), "endTs": _iso(ts + resolution),
+             "utilizationTotal": round(random.Random(f"{serial}-{band}-{ts}").uniform(0, 100), 1)}
+            for ts in range(start, t1 - resolution + 1, resolution)
+        ]
+
+    def _generate_snapshot(self, match, query):
+        return {"url": f"{self.base_url.rsplit(API_PREFIX, 1)[0]}/snapshots/{match.group(1)}.jpg"}
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status, body, content_type="application/json", headers=None):
+                payload = body if isinstance(body, bytes) else json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(payload)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _dispatch(self, method):
+                time.sleep(server.latency_ms / 1000)
+                parsed = urlparse(self.path)
+                if parsed.path.startswith("/snapshots/"):
+                    # La imagen "está lista" recién en el segundo sondeo
+                    with server._lock:
+                        server._snapshot_polls[parsed.path] += 1
+                        ready = server._snapshot_polls[parsed.path] > 1
+                    return self._send(200, b"\xff\xd8fake-jpeg", "image/jpeg") if ready else self._send(404, {})
+                path = parsed.path[len(API_PREFIX):] if parsed.path.startswith(API_PREFIX) else parsed.path
+                query = parse_qs(parsed.query)
+                for route_method, pattern, handler in server._routes():
+                    match = re.fullmatch(pattern, path)
+                    if route_method == method and match:
+                        with server._lock:
+                            server.calls[f"{method} {pattern}"] += 1
+                        try:
+                            result = handler(match, query)
+                        except StubError as e:
+                            return self._send(e.status, {"errors": [str(e)]})
+                        headers = {}
+                        if isinstance(result, tuple):
+                            result, links = result
+                            if links:
+                                headers["Link"] = f"<{server.base_url}{path}?{urlencode(links)}>; rel=next"
+                        return self._send(200, result, headers=headers)
+                self._send(404, {"errors": [f"Ruta no simulada: {method} {path}"]})
+
+            def do_GET(self):
+                self._dispatch("GET")
+
+            def do_POST(self):
+                self._dispatch("POST")
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor simulado del Dashboard de Meraki")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--networks", type=int, default=3)
+    parser.add_argument("--switches", type=int, default=4)
+    parser.add_argument("--aps", type=int, default=10)
+    parser.add_argument("--cameras", type=int, default=5)
+    parser.add_argument("--clients", type=int, default=2000)
+    parser.add_argument("--latency-ms", type=int, default=50)
+    args = parser.parse_args()
+    data = StubData(networks=args.networks, switches=args.switches, aps=args.aps,
+                    cameras=args.cameras, clients=args.clients)
+    server = StubServer(data, latency_ms=args.latency_ms, port=args.port)
+    print(f"Servidor simulado de Meraki en {server.base_url}")
+    server.httpd.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+from typing import Literal, Optional
+from langchain_core.tools import StructuredTool
+from pydantic import BaseModel, Field
+import meraki_utils as mu
+from observations import shape_observation
+
+# Esquemas tipados de las herramientas para el agente con llamadas a funciones nativas:
+# el modelo entrega los argumentos ya estructurados y no hace falta adivinar el formato
+# del input con extract_value.
+
+
+class NoInput(BaseModel):
+    pass
+
+
+class OrgInput(BaseModel):
+    org_id: str = Field(description="ID de la organización (por lo general un número)")
+
+
+class NetworkInput(BaseModel):
+    network_id: str = Field(description="ID de la red (p. ej. L_123 o N_123); se obtiene con list_networks")
+
+
+class ClientsInput(NetworkInput):
+    mode: Literal["list", "count", "top", "search"] = Field(
+        "list", description="list: página de clientes; count: conteo agrupado; top: mayor uso; search: búsqueda"
+    )
+    group_by: Optional[Literal["vlan", "ssid", "os", "manufacturer"]] = Field(
+        None, description="Campo de agrupación para mode='count'"
+    )
+    query: Optional[str] = Field(None, description="MAC, IP o descripción a buscar con mode='search'")
+    limit: Optional[int] = Field(None, description="Máximo de clientes devueltos (list/top/search)")
+    cursor: Optional[str] = Field(None, description="next_cursor de la página anterior (mode='list')")
+    timespan: Optional[int] = Field(None, description="Ventana en segundos (por defecto 86400)")
+
+
+class NetworkStatusInput(NetworkInput):
+    recent_minutes: Optional[int] = Field(None, description="Minutos para contar clientes recientes (por defecto 15)")
+
+
+class SaturationInput(NetworkInput):
+    threshold_kb: Optional[float] = Field(None, description="Uso mínimo en KB para considerar un puerto saturado")
+    top_n: Optional[int] = Field(None, description="Cantidad máxima de puertos devueltos")
+
+
+class OrgSaturationInput(OrgInput):
+    threshold_kb: Optional[float] = Field(None, description="Uso mínimo en KB para considerar un puerto saturado")
+    top_n: Optional[int] = Field(None, description="Cantidad máxima de puertos devueltos")
+
+
+class ChannelTrendsInput(NetworkInput):
+    days: Optional[int] = Field(None, description="Días hacia atrás a analizar (por defecto 7, máximo 30)")
+    limit: Optional[int] = Field(None, description="Cantidad de APs en el ranking (por defecto 10)")
+
+
+class FindDevicesInput(BaseModel):
+    name: Optional[str] = Field(None, description="Prefijo del nombre del dispositivo")
+    serial: Optional[str] = Field(None, description="Prefijo del serial")
+    model: Optional[str] = Field(None, description="Prefijo del modelo (p. ej. MS, MR, MV)")
+    network_id: Optional[str] = Field(None, description="Limitar la búsqueda a una red")
+
+
+class CamerasInput(BaseModel):
+    network_id: Optional[str] = Field(None, description="ID de la red (opcional)")
+
+
+def _structured(tool, func, args_schema, positional=None):
+    """
+    Versión tipada de una herramienta de meraki_utils. Su nombre es el de la función
+    (los nombres de funciones de OpenAI no admiten espacios ni tildes) y conserva la
+    descripción de la herramienta original. Si 'positional' se indica, ese argumento se
+    pasa tal cual (funciones que reciben solo el ID); si no, se pasa un diccionario.
+    El resultado se compacta con shape_observation, igual que en las herramientas de texto.
+    """
+    def run(**kwargs):
+        args = {key: value for key, value in kwargs.items() if value is not None}
+        result = func(args.get(positional)) if positional else func(args)
+        return shape_observation(func.__name__, result)
+
+    return StructuredTool.from_function(
+        func=run, name=func.__name__, description=tool.description, args_schema=args_schema
+    )
+
+
+structured_tools_meraki = [
+    _structured(mu.list_organizations_tool, mu.list_organizations, NoInput),
+    _structured(mu.list_networks_tool, mu.list_networks, OrgInput),
+    _structured(mu.list_devices_tool, mu.list_devices, NetworkInput),
+    _structured(mu.find_devices_tool, mu.find_devices, FindDevicesInput),
+    _structured(mu.list_clients_tool, mu.list_clients, ClientsInput),
+    _structured(mu.get_subscription_end_date_tool, mu.get_subscription_end_date, OrgInput),
+    _structured(mu.get_network_status_tool, mu.get_network_status, NetworkStatusInput),
+    _structured(mu.list_firewall_rules_tool, mu.list_firewall_rules, NetworkInput, positional="network_id"),
+    _structured(mu.list_wireless_channels_tool, mu.list_wireless_channels, NetworkInput, positional="network_id"),
+    _structured(mu.wireless_channel_trends_tool, mu.wireless_channel_trends, ChannelTrendsInput),
+    _structured(mu.list_vlans_tool, mu.list_vlans, NetworkInput, positional="network_id"),
+    _structured(mu.list_saturated_ports_tool, mu.list_saturated_ports, SaturationInput),
+    _structured(mu.org_saturated_ports_tool, mu.org_saturated_ports, OrgSaturationInput),
+    _structured(mu.org_network_status_tool, mu.org_network_status, OrgInput),
+    _structured(mu.org_vlans_tool, mu.org_vlans, OrgInput),
+    _structured(mu.org_firewall_rules_tool, mu.org_firewall_rules, OrgInput),
+    _structured(mu.list_cameras_tool, mu.list_cameras, CamerasInput),
+]
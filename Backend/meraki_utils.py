@@ -3,30 +3,169 @@ import json
 import ast
 import re
 import time
+import heapq
+from collections import Counter
 import requests
-import meraki
-import xml.etree.ElementTree as ET
-from tqdm import tqdm
 from dotenv import load_dotenv
 from langchain.tools import Tool
+from lazy import LazyObject
+from meraki_cache import CachedDashboard, record_deadline
+from meraki_concurrency import fan_out
+from meraki_scheduler import MerakiScheduler, ScheduledDashboard
+from inventory import InventoryIndex, InventorySync
+from camera_index import CameraIndex
+from channel_history import ChannelUtilizationStore
+from metrics import REGISTRY, observe_meraki_call
+from observations import shaped
 # from frame_analyzer import analyze_image_to_json  # Función para analizar imágenes
 
-# Deshabilitar advertencias HTTPS no verificadas (solo para desarrollo)
-import urllib3
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
-
 # Cargar variables de entorno desde .env
 load_dotenv()
 MERAKI_KEY = os.getenv("MERAKI_KEY")
-if not MERAKI_KEY:
-    raise ValueError("❌ ERROR: La clave MERAKI_KEY no está definida en el archivo .env")
+# URL base de la API (los benchmarks la apuntan a un servidor local simulado)
+MERAKI_BASE_URL = os.getenv("MERAKI_BASE_URL", "https://api.meraki.com/api/v1")
 
 # Configuración global para Meraki
 NETWORK_ID = "L_3698581193978021054"
 SAVE_PATH = "imagenes_camaras"  # Carpeta donde se guardarán las imágenes
+CAMERA_INDEX_TTL = int(os.getenv("CAMERA_INDEX_TTL", "900"))
+
+# Sondeo de snapshots de cámaras: espera inicial, espera máxima entre intentos y tiempo total (segundos)
+SNAPSHOT_POLL_INITIAL_DELAY = 0.5
+SNAPSHOT_POLL_MAX_DELAY = 4
+SNAPSHOT_POLL_TIMEOUT = int(os.getenv("SNAPSHOT_POLL_TIMEOUT", "30"))
+SNAPSHOT_HTTP_TIMEOUT = 10
+
+# Tamaño máximo de la caché de lecturas del Dashboard (entradas)
+MERAKI_CACHE_MAX_ENTRIES = int(os.getenv("MERAKI_CACHE_MAX_ENTRIES", "1024"))
+
+# Concurrencia máxima para consultas por dispositivo y límite de solicitudes por segundo
+# por organización (Meraki permite ~10 req/s por organización)
+MERAKI_MAX_WORKERS = int(os.getenv("MERAKI_MAX_WORKERS", "8"))
+MERAKI_RATE_LIMIT = float(os.getenv("MERAKI_RATE_LIMIT", "10"))
+
+# Sesión HTTP compartida (conexiones reutilizadas) para descargar imágenes de cámaras
+http_session = requests.Session()
+http_session.headers.update({"User-Agent": "Mozilla/5.0"})
+http_session.mount("https://", requests.adapters.HTTPAdapter(pool_maxsize=MERAKI_MAX_WORKERS))
+
+# Umbral por defecto (KB de uso total) para considerar un puerto saturado y tamaño del ranking
+SATURATION_THRESHOLD_KB = float(os.getenv("SATURATION_THRESHOLD_KB", "1000000"))
+SATURATION_TOP_N = int(os.getenv("SATURATION_TOP_N", "20"))
+
+# Paginación y límites de las consultas de clientes
+CLIENTS_PAGE_SIZE = 1000
+CLIENTS_DEFAULT_LIMIT = int(os.getenv("CLIENTS_DEFAULT_LIMIT", "50"))
+CLIENTS_MAX_GROUPS = 25
+
+
+def _resolve_org(method_name, args, kwargs):
+    """
+    Organización a la que pertenece una llamada al SDK (para el token bucket del planificador).
+    Las llamadas de red que no están en el índice se resuelven con networks.getNetwork (cacheado);
+    el planificador usa el bucket "default" solo si tampoco así se puede.
+    """
+    first = args[0] if args else None
+    if "Organization" in method_name:
+        return kwargs.get("organizationId", first)
+    if method_name.startswith(("getNetwork", "updateNetwork")) and first:
+        if method_name == "getNetwork":
+            # Evita la recursión: es la llamada que usa el respaldo
+            return inventory.network_org_id(first)
+        try:
+            return get_network_org_id(first)
+        except Exception:
+            return None
+    if "Device" in method_name and first:
+        return inventory.device_org_id(first)
+    return None
+
+
+# Planificador compartido: token bucket por organización, prioridades y unificación de lecturas
+scheduler = MerakiScheduler(rate=MERAKI_RATE_LIMIT)
+
+
+def _create_meraki_client():
+    """Crea el cliente del SDK de Meraki (se importa y construye recién en el primer uso)."""
+    if not MERAKI_KEY:
+        raise ValueError("❌ ERROR: La clave MERAKI_KEY no está definida en el archivo .env")
+    import meraki
+    import urllib3
+    # Deshabilitar advertencias HTTPS no verificadas (solo para desarrollo)
+    urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+    return meraki.DashboardAPI(MERAKI_KEY, base_url=MERAKI_BASE_URL, suppress_logging=True)
+
+
+meraki_client = LazyObject(_create_meraki_client)
+
+# Cliente Meraki detrás del planificador y de una caché TTL + LRU compartida.
+# Usar dashboard.invalidate(...) para forzar datos frescos y dashboard.stats() para ver aciertos/fallos.
+# dashboard.client es el cliente sin caché (pero planificado).
+dashboard = CachedDashboard(
+    ScheduledDashboard(meraki_client, scheduler, _resolve_org, observer=observe_meraki_call),
+    max_entries=MERAKI_CACHE_MAX_ENTRIES,
+)
+
+
+def _dashboard_metrics():
+    """Gauges de la caché del Dashboard y del planificador para /metrics."""
+    cache = dashboard.stats()
+    samples = [
+        ("sophia_meraki_cache_entries", "Entradas en la caché del Dashboard", {}, cache["entries"]),
+        ("sophia_meraki_cache_hits", "Aciertos acumulados de la caché del Dashboard", {}, cache["hits"]),
+        ("sophia_meraki_cache_misses", "Fallos acumulados de la caché del Dashboard", {}, cache["misses"]),
+        ("sophia_meraki_cache_evictions", "Desalojos acumulados de la caché del Dashboard", {}, cache["evictions"]),
+    ]
+    sched = scheduler.stats()
+    for level, stats in sched["priorities"].items():
+        labels = {"priority": level}
+        samples += [
+            ("sophia_meraki_queue_depth", "Solicitudes esperando turno en el planificador", labels, stats["queue_depth"]),
+            ("sophia_meraki_queue_wait_avg_ms", "Espera promedio en el planificador", labels, stats["wait_avg_ms"]),
+            ("sophia_meraki_queue_wait_max_ms", "Espera máxima en el planificador", labels, stats["wait_max_ms"]),
+        ]
+    samples.append(("sophia_meraki_coalesced", "Lecturas unificadas con una llamada en curso", {}, sched["coalesced"]))
+    return samples
+
+
+REGISTRY.add_collector(_dashboard_metrics)
+
+# Índice local de inventario (organizaciones, redes, dispositivos) sincronizado en segundo plano.
+# Las herramientas lo consultan primero mientras su última sincronización no supere INVENTORY_MAX_AGE.
+INVENTORY_DB_PATH = os.getenv("INVENTORY_DB_PATH", "inventory.db")
+INVENTORY_SYNC_INTERVAL = int(os.getenv("INVENTORY_SYNC_INTERVAL", "900"))
+INVENTORY_MAX_AGE = int(os.getenv("INVENTORY_MAX_AGE", str(2 * INVENTORY_SYNC_INTERVAL)))
+inventory = LazyObject(lambda: InventoryIndex(INVENTORY_DB_PATH))
+inventory_sync = InventorySync(inventory, dashboard.client, interval=INVENTORY_SYNC_INTERVAL)
 
-# Inicializar el cliente Meraki
-dashboard = meraki.DashboardAPI(MERAKI_KEY, suppress_logging=True)
+
+# Serie local de utilización de canal por AP y banda: cada consulta pide a la API solo el
+# intervalo posterior a la última descarga (como mucho cada CHANNEL_REFRESH_INTERVAL segundos).
+# La API solo filtra por AP (deviceSerial) junto con una banda: se consulta cada banda de
+# CHANNEL_BANDS, con muestras de CHANNEL_RESOLUTION segundos (600, 1200 o 3600; sin ella la
+# API usa 86400 y las ventanas cortas no traen muestras).
+CHANNEL_DB_PATH = os.getenv("CHANNEL_DB_PATH", "channel_history.db")
+CHANNEL_REFRESH_INTERVAL = int(os.getenv("CHANNEL_REFRESH_INTERVAL", "600"))
+CHANNEL_HISTORY_WINDOW = 86400  # Ventana de list_wireless_channels, de la primera descarga y de cada tramo
+CHANNEL_BANDS = [band.strip() for band in os.getenv("CHANNEL_BANDS", "2.4,5").split(",") if band.strip()]
+CHANNEL_RESOLUTION = int(os.getenv("CHANNEL_RESOLUTION", "600"))
+channel_store = LazyObject(lambda: ChannelUtilizationStore(CHANNEL_DB_PATH))
+
+
+def start_inventory_sync():
+    """Inicia la sincronización periódica del inventario (INVENTORY_SYNC_INTERVAL=0 la desactiva)."""
+    if INVENTORY_SYNC_INTERVAL > 0:
+        inventory_sync.start()
+
+
+def stop_inventory_sync():
+    inventory_sync.stop()
+
+
+def warmup():
+    """Construye por adelantado el cliente de Meraki y abre el índice de inventario."""
+    meraki_client.load()
+    inventory.load()
 
 
 def extract_value(input_data, key):
@@ -53,6 +192,44 @@ def extract_value(input_data, key):
     return input_data
 
 
+def extract_option(input_data, key, default=None):
+    """
+    Como extract_value, pero para parámetros opcionales: si 'key' no viene en el input
+    (o el input no es un diccionario/JSON), devuelve 'default'.
+    """
+    value = extract_value(input_data, key)
+    if value is input_data and not (isinstance(input_data, dict) and key in input_data):
+        return default
+    return value
+
+
+def get_network_org_id(network_id):
+    """Devuelve el organizationId al que pertenece una red (índice local o caché del Dashboard)."""
+    return inventory.network_org_id(network_id) or dashboard.networks.getNetwork(network_id).get("organizationId")
+
+
+def _inventory_dependency(synced_at):
+    """
+    Registra un dato del índice de inventario como dependencia de la respuesta en curso:
+    vale hasta la próxima sincronización (o hasta INVENTORY_MAX_AGE si no hay sincronización
+    periódica). Sin sincronización registrada la respuesta no se cachea.
+    """
+    if synced_at is None:
+        record_deadline(None)
+    else:
+        lifetime = min(INVENTORY_SYNC_INTERVAL or INVENTORY_MAX_AGE, INVENTORY_MAX_AGE)
+        record_deadline(max(synced_at + lifetime - time.time(), 0))
+
+
+def _indexed_devices(network_id):
+    """Dispositivos de la red desde el índice local, o None si el índice no está al día para esa red."""
+    org_id = inventory.network_org_id(network_id)
+    if org_id and inventory.is_fresh(f"org:{org_id}", INVENTORY_MAX_AGE):
+        _inventory_dependency(inventory.synced_at(f"org:{org_id}"))
+        return inventory.devices(network_id)
+    return None
+
+
 # ==============================================================================
 # FUNCIONES BÁSICAS DE REPORTES PARA MERAKI (versión actual sin guardado en JSON)
 # ==============================================================================
@@ -60,6 +237,9 @@ def extract_value(input_data, key):
 def list_organizations(*args, **kwargs):
     """Devuelve una lista de organizaciones en la cuenta de Meraki."""
     try:
+        if inventory.is_fresh("organizations", INVENTORY_MAX_AGE):
+            _inventory_dependency(inventory.synced_at("organizations"))
+            return inventory.organizations()
         return dashboard.organizations.getOrganizations()
     except Exception as e:
         return {"error": f"❌ Error en list_organizations(): {e}"}
@@ -72,6 +252,9 @@ def list_networks(org_id, *args, **kwargs):
     if not org_id or org_id.lower() == "none":
         return {"error": f"❌ Error: org_id tiene un formato incorrecto: {org_id}"}
     try:
+        if inventory.is_fresh(f"org:{org_id}", INVENTORY_MAX_AGE):
+            _inventory_dependency(inventory.synced_at(f"org:{org_id}"))
+            return inventory.networks(org_id)
         return dashboard.organizations.getOrganizationNetworks(org_id)
     except Exception as e:
         return {"error": f"❌ Error en list_networks({org_id}): {e}"}
@@ -84,7 +267,9 @@ def list_devices(network_id, *args, **kwargs):
     if not network_id:
         return {"error": "❌ Error: Se necesita un network_id válido para listar dispositivos."}
     try:
-        devices = dashboard.networks.getNetworkDevices(network_id)
+        devices = _indexed_devices(network_id)
+        if devices is None:
+            devices = dashboard.networks.getNetworkDevices(network_id)
         # Limpiar datos irrelevantes
         for device in devices:
             for key in ["lat", "lng", "address", "tags", "url", "networkId", "details"]:
@@ -94,14 +279,116 @@ def list_devices(network_id, *args, **kwargs):
         return {"error": f"❌ Error en list_devices({network_id}): {e}"}
 
 
+def find_devices(query, *args, **kwargs):
+    """
+    Busca dispositivos en el índice local de inventario por prefijo de nombre, serial o modelo.
+    Acepta name, serial, model y network_id (opcionales). Un texto plano se busca como nombre.
+    """
+    name = extract_option(query, 'name')
+    serial = extract_option(query, 'serial')
+    model = extract_option(query, 'model')
+    network_id = extract_option(query, 'network_id')
+    if not any([name, serial, model, network_id]) and isinstance(query, str):
+        name = query.strip()
+    try:
+        # La búsqueda abarca todas las organizaciones: vale hasta que se resincronice la más antigua
+        _inventory_dependency(inventory.oldest_sync("org:"))
+        devices = inventory.find_devices(name=name, serial=serial, model=model, network_id=network_id)
+        return [
+            {key: device.get(key) for key in ["name", "serial", "model", "networkId", "productType", "lanIp"]}
+            for device in devices
+        ]
+    except Exception as e:
+        return {"error": f"❌ Error en find_devices({query}): {e}"}
+
+
+# Campos que se devuelven de cada cliente (el resto se descarta para no inflar el contexto del LLM)
+CLIENT_FIELDS = ["id", "description", "mac", "ip", "vlan", "ssid", "os", "manufacturer", "status", "lastSeen"]
+
+
+def _client_usage(client):
+    return (client.get("usage") or {}).get("total", 0) or 0
+
+
+def _compact_client(client):
+    compact = {key: client.get(key) for key in CLIENT_FIELDS if client.get(key) is not None}
+    compact["usage_kb"] = _client_usage(client)
+    return compact
+
+
+def iter_clients(network_id, timespan=86400, per_page=CLIENTS_PAGE_SIZE, starting_after=None):
+    """
+    Genera los clientes de una red página por página, sin cargar la lista completa en memoria.
+    Cada página se pide con startingAfter = id del último cliente de la página anterior.
+    Las páginas no pasan por la caché del Dashboard: quedarían todas guardadas a la vez.
+    """
+    while True:
+        params = {"timespan": timespan, "perPage": per_page, "total_pages": 1}
+        if starting_after:
+            params["startingAfter"] = starting_after
+        page = dashboard.call_uncached("networks.getNetworkClients", network_id, **params)
+        yield from page
+        if len(page) < per_page:
+            return
+        starting_after = page[-1].get("id")
+
+
 def list_clients(network_id, *args, **kwargs):
-    """Devuelve la lista de clientes conectados a una red. Requiere network_id."""
-    network_id = extract_value(network_id, 'network_id')
-    network_id = str(network_id).strip()
+    """
+    Consulta los clientes conectados a una red sin devolver la lista completa. Requiere network_id.
+    Opcionales:
+    - mode: "list" (página de clientes, por defecto), "count" (conteo agrupado),
+      "top" (clientes con mayor uso) o "search" (búsqueda por MAC/IP/descripción);
+    - group_by: campo para agrupar en mode="count" (vlan, ssid, os, manufacturer);
+    - query: texto a buscar en mode="search";
+    - limit: máximo de clientes devueltos (list/top/search);
+    - cursor: next_cursor devuelto por la página anterior (mode="list");
+    - timespan: ventana en segundos (por defecto 86400).
+    """
+    input_data = network_id
+    network_id = str(extract_value(input_data, 'network_id')).strip()
     if not network_id:
         return {"error": "❌ Error: Se necesita un network_id válido para listar clientes."}
+    mode = str(extract_option(input_data, 'mode', kwargs.get('mode', 'list'))).lower()
+    group_by = extract_option(input_data, 'group_by', kwargs.get('group_by', 'vlan'))
+    query = str(extract_option(input_data, 'query', kwargs.get('query', ''))).lower()
+    cursor = extract_option(input_data, 'cursor', kwargs.get('cursor'))
     try:
-        return dashboard.networks.getNetworkClients(network_id, total_pages="all")
+        limit = int(extract_option(input_data, 'limit', kwargs.get('limit', CLIENTS_DEFAULT_LIMIT)))
+        timespan = int(extract_option(input_data, 'timespan', kwargs.get('timespan', 86400)))
+    except (TypeError, ValueError) as e:
+        return {"error": f"❌ Error: limit/timespan tienen un formato incorrecto: {e}"}
+    try:
+        if mode == "list":
+            page = dashboard.networks.getNetworkClients(
+                network_id, timespan=timespan, perPage=limit, total_pages=1,
+                **({"startingAfter": cursor} if cursor else {})
+            )
+            return {
+                "clients": [_compact_client(client) for client in page],
+                "next_cursor": page[-1].get("id") if len(page) == limit else None,
+            }
+        clients = iter_clients(network_id, timespan=timespan)
+        if mode == "count":
+            total = 0
+            counts = Counter()
+            for client in clients:
+                total += 1
+                counts[str(client.get(group_by) or "Desconocido")] += 1
+            return {"total": total, f"by_{group_by}": dict(counts.most_common(CLIENTS_MAX_GROUPS))}
+        if mode == "top":
+            top = heapq.nlargest(limit, clients, key=_client_usage)
+            return {"clients": [_compact_client(client) for client in top]}
+        if mode == "search":
+            matches = []
+            for client in clients:
+                haystack = " ".join(str(client.get(key) or "") for key in ("mac", "ip", "description")).lower()
+                if query in haystack:
+                    matches.append(_compact_client(client))
+                    if len(matches) >= limit:
+                        break
+            return {"clients": matches}
+        return {"error": f"❌ Error: mode desconocido '{mode}'. Usa list, count, top o search."}
     except Exception as e:
         return {"error": f"❌ Error en list_clients({network_id}): {e}"}
 
@@ -119,18 +406,67 @@ def get_subscription_end_date(org_id, *args, **kwargs):
         return {"error": f"❌ Error en get_subscription_end_date({org_id}): {e}"}
 
 
+def _device_status_counts(network_id):
+    """Cuenta los dispositivos de la red por estado y por tipo de producto (una sola consulta)."""
+    org_id = get_network_org_id(network_id)
+    statuses = dashboard.organizations.getOrganizationDevicesStatuses(
+        org_id, networkIds=[network_id], total_pages="all"
+    )
+    by_status = Counter()
+    by_product = {}
+    for device in statuses:
+        status = device.get("status") or "unknown"
+        by_status[status] += 1
+        product = by_product.setdefault(device.get("productType") or "unknown", Counter())
+        product[status] += 1
+    return {
+        "total_devices": len(statuses),
+        "devices_by_status": dict(by_status),
+        "devices_by_product_type": {product: dict(counts) for product, counts in by_product.items()},
+    }
+
+
+def _recent_client_count(network_id, minutes):
+    """Cuenta clientes vistos en los últimos 'minutes' minutos con una sola página de resultados."""
+    page = dashboard.networks.getNetworkClients(
+        network_id, timespan=minutes * 60, perPage=CLIENTS_PAGE_SIZE, total_pages=1
+    )
+    return len(page) if len(page) < CLIENTS_PAGE_SIZE else f"{CLIENTS_PAGE_SIZE}+"
+
+
 def get_network_status(network_id, *args, **kwargs):
     """
-    Genera un reporte resumido del estado de la red basado en la cantidad de dispositivos y clientes.
-    Requiere network_id.
+    Genera un reporte resumido del estado de la red: dispositivos por estado (online/offline)
+    y por tipo de producto, total de clientes del último día y clientes de los últimos N minutos.
+    Requiere network_id. Opcional: recent_minutes (por defecto 15).
+    Las consultas se hacen en paralelo y nunca se descarga la lista completa de clientes.
     """
-    devices = list_devices(network_id)
-    clients = list_clients(network_id)
+    input_data = network_id
+    network_id = str(extract_value(input_data, 'network_id')).strip()
+    if not network_id:
+        return {"error": "❌ Error: Se necesita un network_id válido para el estado de la red."}
     try:
-        report = {
-            "total_devices": len(devices) if isinstance(devices, list) else "N/A",
-            "total_clients": len(clients) if isinstance(clients, list) else "N/A"
-        }
+        recent_minutes = int(extract_option(input_data, 'recent_minutes', kwargs.get('recent_minutes', 15)))
+    except (TypeError, ValueError) as e:
+        return {"error": f"❌ Error: recent_minutes tiene un formato incorrecto: {e}"}
+
+    tasks = {
+        "devices": lambda: _device_status_counts(network_id),
+        "clients": lambda: dashboard.networks.getNetworkClientsOverview(network_id, timespan=86400),
+        "recent": lambda: _recent_client_count(network_id, recent_minutes),
+    }
+    results, errors = fan_out(lambda name: tasks[name](), list(tasks), max_workers=len(tasks))
+    data = dict(results)
+    for name, e in errors:
+        print(f"❌ Error en get_network_status({network_id}) [{name}]: {e}")
+    try:
+        report = data.get("devices")
+        if report is None:
+            devices = list_devices(network_id)
+            report = {"total_devices": len(devices) if isinstance(devices, list) else "N/A"}
+        clients = data.get("clients")
+        report["total_clients"] = ((clients or {}).get("counts") or {}).get("total", "N/A")
+        report[f"clients_last_{recent_minutes}_min"] = data.get("recent", "N/A")
         return report
     except Exception as e:
         return {"error": f"❌ Error en get_network_status({network_id}): {e}"}
@@ -147,32 +483,113 @@ def list_firewall_rules(network_id):
         return {"error": f"❌ Error en list_firewall_rules({network_id}): {e}"}
 
 
+def _iso(ts):
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(ts))
+
+
+def _sync_channel_history(network_id, wireless_devices):
+    """
+    Completa la serie local de cada AP y banda pidiendo solo lo que falta desde su última
+    descarga; los APs descargados hace menos de CHANNEL_REFRESH_INTERVAL no se consultan.
+    Un hueco largo (p. ej. días sin consultas) se completa en tramos de CHANNEL_HISTORY_WINDOW,
+    hasta la retención de la serie; la primera descarga de un AP trae solo la última ventana.
+    La respuesta en curso vale hasta el próximo refresco de la serie (no se cachea si alguna descarga falla).
+    """
+    now = int(time.time())
+    oldest = now - channel_store.retention_days * 86400
+    pending = []
+    next_refresh = now + CHANNEL_REFRESH_INTERVAL
+    for device in wireless_devices:
+        for band in CHANNEL_BANDS:
+            fetched_until, checked_at = channel_store.fetch_state(device['serial'], band) or (None, None)
+            if checked_at is None or now - checked_at >= CHANNEL_REFRESH_INTERVAL:
+                start = now - CHANNEL_HISTORY_WINDOW if fetched_until is None else max(fetched_until, oldest)
+                pending.append((device['serial'], band, start))
+            else:
+                next_refresh = min(next_refresh, checked_at + CHANNEL_REFRESH_INTERVAL)
+
+    def fetch(item):
+        # Tramos en orden: si uno falla, fetched_until queda en el último guardado y la
+        # próxima consulta retoma desde ahí
+        serial, band, t0 = item
+        stored = 0
+        for start in range(t0, now, CHANNEL_HISTORY_WINDOW):
+            end = min(start + CHANNEL_HISTORY_WINDOW, now)
+            samples = dashboard.client.wireless.getNetworkWirelessChannelUtilizationHistory(
+                network_id, deviceSerial=serial, band=band, resolution=CHANNEL_RESOLUTION,
+                t0=_iso(start), t1=_iso(end),
+            )
+            # Los tramos anteriores al último ya están cerrados: quedan descargados aunque no traigan muestras
+            stored += channel_store.store(network_id, serial, band, samples, now, since=start,
+                                          until=end if end < now else None)
+        return stored
+
+    _, errors = fan_out(fetch, pending, max_workers=MERAKI_MAX_WORKERS)
+    for (serial, _, _), e in errors:
+        print(f"❌ Error obteniendo datos de {serial}: {e}")
+    if pending:
+        channel_store.downsample(now)
+    record_deadline(None if errors else next_refresh - now)
+
+
+def _wireless_devices(network_id):
+    devices = dashboard.networks.getNetworkDevices(network_id)
+    return [device for device in devices if device.get('model', '').startswith('MR')]
+
+
 def list_wireless_channels(network_id):
-    """Listar canales inalámbricos ordenados por saturación."""
+    """Listar canales inalámbricos ordenados por saturación (últimas 24 horas, desde la serie local)."""
     try:
-        devices = dashboard.networks.getNetworkDevices(network_id)
-        wireless_devices = [device for device in devices if device.get('model', '').startswith('MR')]
+        wireless_devices = _wireless_devices(network_id)
         if not wireless_devices:
             print("⚠ No hay dispositivos inalámbricos en esta red.")
             return []
-        channel_data = []
-        for device in wireless_devices:
-            try:
-                data = dashboard.wireless.getNetworkWirelessChannelUtilizationHistory(
-                    network_id, serial=device['serial'], timespan=86400
-                )
-                if data:
-                    channel_data.extend(data)
-            except Exception as e:
-                print(f"❌ Error obteniendo datos de {device['serial']}: {e}")
-        if not channel_data:
+        _sync_channel_history(network_id, wireless_devices)
+        sorted_data = channel_store.recent(network_id, time.time() - CHANNEL_HISTORY_WINDOW)
+        if not sorted_data:
             print("⚠ No se encontraron datos de utilización de canales inalámbricos.")
-        sorted_data = sorted(channel_data, key=lambda x: x['utilization']['total'], reverse=True)
         return sorted_data
     except Exception as e:
         return {"error": f"❌ Error en list_wireless_channels({network_id}): {e}"}
 
 
+def wireless_channel_trends(network_id, *args, **kwargs):
+    """
+    Tendencias de utilización de canal de una red desde la serie local: APs con mayor
+    utilización promedio (y su pico) y horas del día más cargadas. Requiere network_id.
+    Opcionales: days (por defecto 7, hasta 30) y limit (por defecto 10).
+    """
+    input_data = network_id
+    network_id = str(extract_value(input_data, 'network_id')).strip()
+    if not network_id:
+        return {"error": "❌ Error: Se necesita un network_id válido para las tendencias de canales."}
+    try:
+        days = min(int(extract_option(input_data, 'days', kwargs.get('days', 7))), 30)
+        limit = int(extract_option(input_data, 'limit', kwargs.get('limit', 10)))
+    except (TypeError, ValueError) as e:
+        return {"error": f"❌ Error: days/limit tienen un formato incorrecto: {e}"}
+    try:
+        wireless_devices = _wireless_devices(network_id)
+        if not wireless_devices:
+            return "No hay dispositivos inalámbricos en esta red."
+        _sync_channel_history(network_id, wireless_devices)
+        since = time.time() - days * 86400
+        names = {device['serial']: device.get('name') for device in wireless_devices}
+        worst_aps = channel_store.worst_aps(network_id, since, limit=limit)
+        for ap in worst_aps:
+            ap["name"] = names.get(ap["serial"])
+        # La serie puede empezar después de 'since' (APs recién agregados o descargados por primera vez)
+        first = channel_store.first_timestamp(network_id, since)
+        return {
+            "days": days,
+            "data_since_utc": _iso(first) if first is not None else None,
+            "worst_aps": worst_aps,
+            "peak_hours_utc": channel_store.peak_hours(network_id, since),
+        }
+    except Exception as e:
+        return {"error": f"❌ Error en wireless_channel_trends({network_id}): {e}"}
+
+
 def list_vlans(network_id):
     """Listar las VLANs configuradas en una red específica."""
     try:
@@ -182,33 +599,252 @@ def list_vlans(network_id):
         return {"error": f"❌ Error en list_vlans({network_id}): {e}"}
 
 
-def list_saturated_ports(network_id):
-    """Listar equipos con puertos de switch saturados en una red Meraki."""
+def _items(response):
+    """Los endpoints paginados de organización pueden responder {"items": [...], "meta": {...}}."""
+    return response.get("items", []) if isinstance(response, dict) else response
+
+
+def _iter_switch_ports_bulk(network_id):
+    """
+    Recorre los puertos de todos los switches de la red usando el endpoint
+    de organización (una sola consulta paginada en lugar de una por switch).
+    Genera tuplas (datos del switch, puerto).
+    """
+    org_id = get_network_org_id(network_id)
+    switches = dashboard.switch.getOrganizationSwitchPortsStatusesBySwitch(
+        org_id, networkIds=[network_id], total_pages="all"
+    )
+    for switch in _items(switches):
+        for port in switch.get("ports", []):
+            yield {"switch_serial": switch.get("serial")}, port
+
+
+def _iter_switch_ports_per_device(network_id):
+    """
+    Alternativa cuando el endpoint de organización no está disponible: consulta los
+    puertos de cada switch MS en paralelo. Genera tuplas (datos del switch, puerto).
+    """
+    devices = dashboard.networks.getNetworkDevices(network_id)
+    switches = [device for device in devices if device.get('model', '').startswith('MS')]
+    results, errors = fan_out(
+        lambda switch: dashboard.switch.getDeviceSwitchPortsStatuses(switch.get('serial')),
+        switches,
+        max_workers=MERAKI_MAX_WORKERS,
+    )
+    for switch, e in errors:
+        print(f"❌ Error obteniendo puertos de {switch.get('serial')}: {e}")
+    for switch, ports in results:
+        for port in ports:
+            yield {"switch_serial": switch.get('serial')}, port
+
+
+def _saturation_options(input_data, kwargs):
+    """Lee threshold_kb y top_n del input (o usa los valores por defecto)."""
+    threshold_kb = float(extract_option(input_data, 'threshold_kb', kwargs.get('threshold_kb', SATURATION_THRESHOLD_KB)))
+    top_n = int(extract_option(input_data, 'top_n', kwargs.get('top_n', SATURATION_TOP_N)))
+    return threshold_kb, top_n
+
+
+def _rank_saturated_ports(stream, threshold_kb, top_n):
+    """
+    Filtra los puertos por umbral a medida que llegan y conserva en memoria
+    solo los top_n con mayor uso, ordenados de mayor a menor.
+    """
+    def saturated():
+        for info, port in stream:
+            port_id = port.get("portId")
+            usage = (port.get("usageInKb") or {}).get("total", 0)
+            if port_id is not None and usage > threshold_kb:
+                yield {**info, "port": port_id, "usage_kb": usage}
+
+    return heapq.nlargest(top_n, saturated(), key=lambda x: x["usage_kb"])
+
+
+def list_saturated_ports(network_id, *args, **kwargs):
+    """
+    Listar equipos con puertos de switch saturados en una red Meraki.
+    Requiere network_id. Opcionales: threshold_kb (uso total mínimo en KB) y top_n
+    (cantidad máxima de puertos a devolver, ordenados de mayor a menor uso).
+    """
+    input_data = network_id
+    network_id = str(extract_value(input_data, 'network_id')).strip()
     try:
-        devices = dashboard.networks.getNetworkDevices(network_id)
-        switches = [device for device in devices if device.get('model', '').startswith('MS')]
-        if not switches:
+        threshold_kb, top_n = _saturation_options(input_data, kwargs)
+    except (TypeError, ValueError) as e:
+        return {"error": f"❌ Error: threshold_kb/top_n tienen un formato incorrecto: {e}"}
+    try:
+        try:
+            ports = _iter_switch_ports_bulk(network_id)
+            first = next(ports, None)
+        except Exception as e:
+            print(f"⚠ Endpoint de organización no disponible, consultando switch por switch: {e}")
+            ports = _iter_switch_ports_per_device(network_id)
+            first = next(ports, None)
+        if first is None:
             return "No se encontraron switches en esta red."
-        saturated_ports = []
-        for switch in switches:
-            serial = switch.get('serial')
-            ports = dashboard.switch.getDeviceSwitchPortsStatuses(serial)
-            for port in ports:
-                port_id = port.get("portId")
-                usage = port.get("usageInKb", {}).get("total", 0)
-                if port_id is not None and usage > 1000000:
-                    saturated_ports.append({
-                        "switch_serial": serial,
-                        "port": port_id,
-                        "usage_kb": usage
-                    })
+        saturated_ports = _rank_saturated_ports(_chain_first(first, ports), threshold_kb, top_n)
         if not saturated_ports:
             return "No se encontraron puertos saturados en los switches."
-        saturated_ports.sort(key=lambda x: x["usage_kb"], reverse=True)
         return saturated_ports
     except Exception as e:
         return {"error": f"❌ Error en list_saturated_ports({network_id}): {e}"}
 
+
+def _chain_first(first, rest):
+    """Reinyecta el primer elemento ya consumido de un generador."""
+    yield first
+    yield from rest
+
+# ==============================================================================
+# REPORTES A NIVEL DE ORGANIZACIÓN (VARIAS REDES EN PARALELO)
+# ==============================================================================
+
+def _org_networks(org_id, product_type=None):
+    """Redes de la organización, opcionalmente solo las que tienen el tipo de producto indicado."""
+    networks = list_networks(org_id)
+    if isinstance(networks, dict):
+        raise Exception(networks.get("error"))
+    if product_type:
+        networks = [net for net in networks if product_type in net.get("productTypes", [])]
+    return networks
+
+
+def _org_fan_out(org_id, func, product_type=None):
+    """
+    Ejecuta func(network_id) en paralelo para cada red de la organización, respetando el
+    límite de solicitudes. Retorna ({nombre de red: resultado}, {nombre de red: error}).
+    """
+    networks = _org_networks(org_id, product_type)
+    results, errors = fan_out(lambda net: func(net["id"]), networks, max_workers=MERAKI_MAX_WORKERS)
+    data, failed = {}, {net.get("name", net["id"]): str(e) for net, e in errors}
+    for net, result in results:
+        name = net.get("name", net["id"])
+        if isinstance(result, dict) and "error" in result:
+            failed[name] = result["error"]
+        else:
+            data[name] = result
+    return data, failed
+
+
+def _org_report(org_id, fn_name, build):
+    org_id = str(extract_value(org_id, 'org_id')).strip()
+    if not org_id or org_id.lower() == "none":
+        return {"error": f"❌ Error: org_id tiene un formato incorrecto: {org_id}"}
+    try:
+        return build(org_id)
+    except Exception as e:
+        return {"error": f"❌ Error en {fn_name}({org_id}): {e}"}
+
+
+def org_saturated_ports(org_id, *args, **kwargs):
+    """
+    Puertos saturados en todas las redes de una organización. Requiere org_id.
+    Opcionales: threshold_kb y top_n. Devuelve el conteo por red y el ranking global.
+    """
+    input_data = org_id
+    try:
+        threshold_kb, top_n = _saturation_options(input_data, kwargs)
+    except (TypeError, ValueError) as e:
+        return {"error": f"❌ Error: threshold_kb/top_n tienen un formato incorrecto: {e}"}
+
+    def build(org_id):
+        per_network = Counter()
+
+        def counted(stream):
+            for info, port in stream:
+                usage = (port.get("usageInKb") or {}).get("total", 0)
+                if port.get("portId") is not None and usage > threshold_kb:
+                    per_network[info["network"]] += 1
+                yield info, port
+
+        def org_ports():
+            switches = dashboard.switch.getOrganizationSwitchPortsStatusesBySwitch(org_id, total_pages="all")
+            for switch in _items(switches):
+                network = (switch.get("network") or {}).get("name") or (switch.get("network") or {}).get("id")
+                for port in switch.get("ports", []):
+                    yield {"network": network, "switch_serial": switch.get("serial")}, port
+
+        failed = {}
+        try:
+            top_ports = _rank_saturated_ports(counted(org_ports()), threshold_kb, top_n)
+        except Exception as e:
+            # Sin endpoint de organización: una consulta por red, en paralelo
+            print(f"⚠ Endpoint de organización no disponible, consultando red por red: {e}")
+            per_network.clear()
+            data, failed = _org_fan_out(
+                org_id, lambda net_id: list_saturated_ports(net_id, threshold_kb=threshold_kb, top_n=top_n), "switch"
+            )
+            ranked = []
+            for network, ports in data.items():
+                if isinstance(ports, list):
+                    per_network[network] = len(ports)
+                    ranked.extend({"network": network, **port} for port in ports)
+            top_ports = heapq.nlargest(top_n, ranked, key=lambda x: x["usage_kb"])
+        return {"networks_with_saturated_ports": dict(per_network), "top_ports": top_ports, "errors": failed}
+
+    return _org_report(input_data, "org_saturated_ports", build)
+
+
+def org_network_status(org_id, *args, **kwargs):
+    """
+    Estado de todas las redes de una organización: dispositivos online/offline y clientes
+    del último día por red. Requiere org_id.
+    """
+    def build(org_id):
+        networks = _org_networks(org_id)
+        names = {net["id"]: net.get("name", net["id"]) for net in networks}
+        report = {name: {"online": 0, "offline": 0, "alerting": 0, "clients": "N/A"} for name in names.values()}
+        statuses = dashboard.organizations.getOrganizationDevicesStatuses(org_id, total_pages="all")
+        for device in statuses:
+            name = names.get(device.get("networkId"))
+            status = device.get("status")
+            if name in report and status in report[name]:
+                report[name][status] += 1
+        clients, failed = _org_fan_out(
+            org_id, lambda net_id: dashboard.networks.getNetworkClientsOverview(net_id, timespan=86400)
+        )
+        for name, overview in clients.items():
+            report[name]["clients"] = ((overview or {}).get("counts") or {}).get("total", "N/A")
+        ranked = sorted(report.items(), key=lambda item: (item[1]["offline"], item[1]["alerting"]), reverse=True)
+        return {"networks": [{"network": name, **counts} for name, counts in ranked], "errors": failed}
+
+    return _org_report(org_id, "org_network_status", build)
+
+
+def org_vlans(org_id, *args, **kwargs):
+    """VLANs (id, nombre y subred) de todas las redes con appliance de una organización. Requiere org_id."""
+    def build(org_id):
+        data, failed = _org_fan_out(org_id, list_vlans, "appliance")
+        vlans = {
+            network: [{key: vlan.get(key) for key in ("id", "name", "subnet")} for vlan in network_vlans]
+            for network, network_vlans in data.items()
+        }
+        return {"vlans": vlans, "errors": failed}
+
+    return _org_report(org_id, "org_vlans", build)
+
+
+def org_firewall_rules(org_id, *args, **kwargs):
+    """
+    Reglas de firewall L3 personalizadas (sin la regla por defecto) de todas las redes
+    con appliance de una organización. Requiere org_id.
+    """
+    def build(org_id):
+        data, failed = _org_fan_out(
+            org_id, lambda net_id: dashboard.appliance.getNetworkApplianceFirewallL3FirewallRules(net_id), "appliance"
+        )
+        fields = ("policy", "protocol", "srcCidr", "destCidr", "destPort", "comment")
+        rules = {
+            network: [
+                {key: rule.get(key) for key in fields}
+                for rule in result.get("rules", []) if rule.get("comment") != "Default rule"
+            ]
+            for network, result in data.items()
+        }
+        return {"custom_rules": rules, "errors": failed}
+
+    return _org_report(org_id, "org_firewall_rules", build)
+
 # ==============================================================================
 # NUEVAS FUNCIONES PARA CAMARAS
 # ==============================================================================
@@ -219,53 +855,110 @@ def clean_camera_filename(name: str) -> str:
     """
     return re.sub(r'[<>:"/\\|?*]', '_', name)
 
-def list_cameras(*args, **kwargs) -> list:
+def _load_network_devices(network_id):
+    devices = _indexed_devices(network_id)
+    return devices if devices is not None else dashboard.networks.getNetworkDevices(network_id)
+
+
+# Índice nombre -> cámara por red, reconstruido cada CAMERA_INDEX_TTL segundos
+camera_index = CameraIndex(_load_network_devices, clean_camera_filename, ttl=CAMERA_INDEX_TTL)
+
+
+def _camera_network_id(input_data):
+    """
+    Extrae el network_id del input; si no viene ninguno se usa NETWORK_ID.
+    Lanza ValueError si viene uno que no es un id de red (L_... o N_...).
+    """
+    network_id = extract_option(input_data, 'network_id')
+    if network_id is None and isinstance(input_data, str) and not input_data.strip().startswith("{"):
+        network_id = input_data  # Id en texto plano
+    network_id = str(network_id or "").strip()
+    if not network_id or network_id.lower() == "none":
+        return NETWORK_ID
+    if not re.match(r"^[LN]_", network_id):
+        raise ValueError(f"network_id tiene un formato incorrecto: {network_id}")
+    return network_id
+
+
+def list_cameras(network_id=None, *args, **kwargs) -> list:
     """
     Retorna una lista de nombres de cámaras (modelos que comienzan con 'MV') en la red Meraki.
+    Acepta un network_id opcional (por defecto NETWORK_ID).
     """
-    devices = dashboard.networks.getNetworkDevices(NETWORK_ID)
-    cameras = [d for d in devices if d.get("model", "").startswith("MV")]
-    camera_names = []
-    for cam in cameras:
-        name = cam.get("name", cam.get("serial"))
-        camera_names.append(clean_camera_filename(name))
-    return camera_names
-
-def get_camera_by_name(camera_name: str) -> dict:
-    """
-    Busca y retorna el diccionario de la cámara que coincida con el nombre proporcionado.
-    Retorna None si no se encuentra.
-    """
-    devices = dashboard.networks.getNetworkDevices(NETWORK_ID)
-    cameras = [d for d in devices if d.get("model", "").startswith("MV")]
-    camera_name_clean = clean_camera_filename(camera_name)
-    for cam in cameras:
-        name = cam.get("name", cam.get("serial"))
-        if clean_camera_filename(name) == camera_name_clean:
-            return cam
-    return None
+    try:
+        network_id = _camera_network_id(network_id)
+    except ValueError as e:
+        return {"error": f"❌ Error: {e}"}
+    return camera_index.names(network_id)
+
+def get_camera_by_name(camera_name: str, network_id: str = None) -> dict:
+    """
+    Busca y retorna el diccionario de la cámara que coincida con el nombre proporcionado
+    (exacto, por prefijo o aproximado). Retorna None si no se encuentra.
+    Lanza ValueError si network_id no es un id de red.
+    """
+    camera = camera_index.lookup(_camera_network_id(network_id), camera_name)
+    return camera["device"] if camera else None
+
+def _wait_for_snapshot(snapshot_url):
+    """
+    Sondea la URL del snapshot con espera exponencial corta hasta que la imagen esté lista
+    (Meraki responde 404/403 mientras la genera). Retorna la respuesta HTTP en streaming.
+    """
+    delay = SNAPSHOT_POLL_INITIAL_DELAY
+    deadline = time.monotonic() + SNAPSHOT_POLL_TIMEOUT
+    while True:
+        img_response = http_session.get(snapshot_url, stream=True, timeout=SNAPSHOT_HTTP_TIMEOUT)
+        if img_response.status_code == 200:
+            return img_response
+        img_response.close()
+        if img_response.status_code not in (403, 404, 503) or time.monotonic() + delay > deadline:
+            raise Exception(f"Error al descargar la imagen: {img_response.status_code} {img_response.reason}")
+        time.sleep(delay)
+        delay = min(delay * 2, SNAPSHOT_POLL_MAX_DELAY)
+
 
 def download_camera_image(camera_serial: str, camera_name: str) -> str:
     """
-    Solicita un snapshot de la cámara mediante la API de Meraki y descarga la imagen.
-    Retorna la ruta local donde se guardó la imagen.
+    Solicita un snapshot de la cámara mediante la API de Meraki y descarga la imagen
+    en cuanto está disponible. Retorna la ruta local donde se guardó la imagen.
     """
     response = dashboard.camera.generateDeviceCameraSnapshot(camera_serial)
     if "url" not in response:
         raise Exception("No se obtuvo URL de imagen. Verifica permisos o disponibilidad de la cámara.")
-    snapshot_url = response["url"]
-    time.sleep(10)  # Espera a que la imagen esté lista
-    headers = {"User-Agent": "Mozilla/5.0"}
-    img_response = requests.get(snapshot_url, headers=headers, stream=True)
-    if img_response.status_code != 200:
-        raise Exception(f"Error al descargar la imagen: {img_response.status_code} {img_response.reason}")
-    if not os.path.exists(SAVE_PATH):
-        os.makedirs(SAVE_PATH)
+    img_response = _wait_for_snapshot(response["url"])
+    os.makedirs(SAVE_PATH, exist_ok=True)
     img_path = os.path.join(SAVE_PATH, f"{camera_name}.jpg")
-    with open(img_path, "wb") as f:
-        for chunk in img_response.iter_content(1024):
+    with img_response, open(img_path, "wb") as f:
+        for chunk in img_response.iter_content(64 * 1024):
             f.write(chunk)
     return img_path
+
+
+def download_camera_images(cameras) -> list:
+    """
+    Descarga en paralelo los snapshots de varias cámaras. 'cameras' es una lista de
+    dicts de dispositivo (con serial y name) o de nombres de cámara.
+    Retorna, por cámara, la ruta de la imagen o el error, y la latencia en ms.
+    """
+    def snapshot(cam):
+        started = time.perf_counter()
+        if isinstance(cam, str):
+            cam = get_camera_by_name(cam) or {"name": cam}
+        serial = cam.get("serial")
+        name = clean_camera_filename(cam.get("name") or serial or "")
+        if not serial:
+            raise Exception(f'No se encontró la cámara con nombre "{name}"')
+        path = download_camera_image(serial, name)
+        return {"camera": name, "serial": serial, "path": path,
+                "latency_ms": round((time.perf_counter() - started) * 1000)}
+
+    results, errors = fan_out(snapshot, cameras, max_workers=MERAKI_MAX_WORKERS)
+    report = [result for _, result in results]
+    for cam, e in errors:
+        name = cam if isinstance(cam, str) else cam.get("name", cam.get("serial"))
+        report.append({"camera": name, "error": str(e)})
+    return report
 """
 def analyze_camera(camera_input) -> str:
     
@@ -302,69 +995,133 @@ def analyze_camera(camera_input) -> str:
 
 list_organizations_tool = Tool(
     name="Listar Organizaciones",
-    func=list_organizations,
+    func=shaped("list_organizations", list_organizations),
     description="Devuelve una lista de organizaciones en la cuenta de Meraki."
 )
 
 list_networks_tool = Tool(
     name="Listar Redes",
-    func=lambda org_data: list_networks(org_data.get("org_id") if isinstance(org_data, dict) else org_data),
+    func=shaped("list_networks", lambda org_data: list_networks(
+        org_data.get("org_id") if isinstance(org_data, dict) else org_data
+    )),
     description="Devuelve el listado de redes de una organización. Requiere org_id."
 )
 
 list_devices_tool = Tool(
     name="Listar Dispositivos",
-    func=lambda net_data: list_devices(net_data.get("network_id") if isinstance(net_data, dict) else net_data),
+    func=shaped("list_devices", lambda net_data: list_devices(
+        net_data.get("network_id") if isinstance(net_data, dict) else net_data
+    )),
     description="Devuelve la lista de dispositivos en una red. Requiere network_id."
 )
 
 list_clients_tool = Tool(
     name="Listar Clientes",
-    func=lambda net_data: list_clients(net_data.get("network_id") if isinstance(net_data, dict) else net_data),
-    description="Devuelve la lista de clientes conectados en una red. Requiere network_id."
+    func=shaped("list_clients", list_clients),
+    description=(
+        "Consulta los clientes conectados en una red. Requiere network_id. Opcionales: "
+        "mode ('list' paginado con limit y cursor, 'count' agrupado por group_by = vlan/ssid/os/manufacturer, "
+        "'top' por uso, 'search' por MAC/IP/descripción con query) y timespan en segundos."
+    )
 )
 
 get_subscription_end_date_tool = Tool(
     name="Fecha de Suscripción",
-    func=lambda org_data: get_subscription_end_date(org_data.get("org_id") if isinstance(org_data, dict) else org_data),
+    func=shaped("get_subscription_end_date", lambda org_data: get_subscription_end_date(
+        org_data.get("org_id") if isinstance(org_data, dict) else org_data
+    )),
     description="Devuelve la fecha de expiración de la suscripción de una organización. Requiere org_id."
 )
 
 get_network_status_tool = Tool(
     name="Estado de la Red",
-    func=get_network_status,
-    description="Devuelve un reporte con el total de dispositivos y clientes en una red. Requiere network_id."
+    func=shaped("get_network_status", get_network_status),
+    description=(
+        "Devuelve un reporte del estado de una red: dispositivos online/offline por tipo de producto, "
+        "total de clientes y clientes recientes. Requiere network_id. Opcional: recent_minutes."
+    )
 )
 
 list_firewall_rules_tool = Tool(
     name="Listar Reglas de Firewall",
-    func=list_firewall_rules,
+    func=shaped("list_firewall_rules", list_firewall_rules),
     description="Devuelve las reglas de firewall configuradas en una red. Requiere network_id."
 )
 
 list_wireless_channels_tool = Tool(
     name="Listar Canales Inalámbricos",
-    func=list_wireless_channels,
+    func=shaped("list_wireless_channels", list_wireless_channels),
     description="Devuelve los canales inalámbricos ordenados por saturación en una red. Requiere network_id."
 )
 
+wireless_channel_trends_tool = Tool(
+    name="Tendencias de Canales Inalámbricos",
+    func=shaped("wireless_channel_trends", wireless_channel_trends),
+    description=(
+        "Devuelve los APs con mayor utilización de canal (promedio y pico) y las horas del día más "
+        "cargadas de una red. Requiere network_id. Opcionales: days (por defecto 7) y limit."
+    )
+)
+
 list_vlans_tool = Tool(
     name="Listar VLANs",
-    func=list_vlans,
+    func=shaped("list_vlans", list_vlans),
     description="Devuelve las VLANs configuradas en una red. Requiere network_id."
 )
 
 list_saturated_ports_tool = Tool(
     name="Listar Puertos Saturados",
-    func=list_saturated_ports,
-    description="Devuelve un reporte de puertos de switches saturados en una red. Requiere network_id."
+    func=shaped("list_saturated_ports", list_saturated_ports),
+    description=(
+        "Devuelve un ranking de puertos de switches saturados en una red. Requiere network_id. "
+        "Opcionales: threshold_kb (uso mínimo en KB, por defecto 1000000) y top_n (por defecto 20)."
+    )
+)
+
+find_devices_tool = Tool(
+    name="Buscar Dispositivos",
+    func=shaped("find_devices", find_devices),
+    description=(
+        "Busca dispositivos en el inventario local por prefijo de nombre, serial o modelo "
+        "(name, serial, model y opcionalmente network_id). Es instantáneo y no consume cuota de la API."
+    )
+)
+
+org_saturated_ports_tool = Tool(
+    name="Puertos Saturados de la Organización",
+    func=shaped("org_saturated_ports", org_saturated_ports),
+    description=(
+        "Devuelve, para todas las redes de una organización, cuántos puertos saturados tiene cada red "
+        "y el ranking global de los más saturados. Requiere org_id. Opcionales: threshold_kb y top_n."
+    )
+)
+
+org_network_status_tool = Tool(
+    name="Estado de las Redes de la Organización",
+    func=shaped("org_network_status", org_network_status),
+    description="Devuelve dispositivos online/offline y clientes de cada red de una organización. Requiere org_id."
+)
+
+org_vlans_tool = Tool(
+    name="VLANs de la Organización",
+    func=shaped("org_vlans", org_vlans),
+    description="Devuelve las VLANs de todas las redes de una organización. Requiere org_id."
+)
+
+org_firewall_rules_tool = Tool(
+    name="Reglas de Firewall de la Organización",
+    func=shaped("org_firewall_rules", org_firewall_rules),
+    description="Devuelve las reglas de firewall personalizadas de todas las redes de una organización. Requiere org_id."
 )
 
 # Nuevos tools para cámaras
 list_cameras_tool = Tool(
     name="Listar Cámaras",
-    func=list_cameras,
-    description="Devuelve una lista de nombres de cámaras (modelos que comienzan con 'MV') en la red Meraki."
+    func=shaped("list_cameras", list_cameras),
+    description=(
+        "Devuelve una lista de nombres de cámaras (modelos que comienzan con 'MV') en la red Meraki. "
+        "Acepta network_id opcional."
+    )
 )
 """
 analyze_camera_tool = Tool(
@@ -381,13 +1138,19 @@ tools_meraki = [
     list_organizations_tool,
     list_networks_tool,
     list_devices_tool,
+    find_devices_tool,
     list_clients_tool,
     get_subscription_end_date_tool,
     get_network_status_tool,
     list_firewall_rules_tool,
     list_wireless_channels_tool,
+    wireless_channel_trends_tool,
     list_vlans_tool,
     list_saturated_ports_tool,
+    org_saturated_ports_tool,
+    org_network_status_tool,
+    org_vlans_tool,
+    org_firewall_rules_tool,
     list_cameras_tool,
     # analyze_camera_tool
 ]
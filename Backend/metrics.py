@@ -0,0 +1,216 @@
+import bisect
+import contextvars
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import uuid
+
+# Destino de las trazas por solicitud (una línea JSON cada una): "stderr", una ruta de archivo u "off"
+SOPHIA_TRACE_LOG = os.getenv("SOPHIA_TRACE_LOG", "stderr")
+
+trace_logger = logging.getLogger("sophia.trace")
+trace_logger.propagate = False
+if SOPHIA_TRACE_LOG.lower() == "off":
+    trace_logger.disabled = True
+else:
+    trace_logger.setLevel(logging.INFO)
+    trace_logger.addHandler(
+        logging.StreamHandler(sys.stderr) if SOPHIA_TRACE_LOG.lower() == "stderr"
+        else logging.FileHandler(SOPHIA_TRACE_LOG, encoding="utf-8")
+    )
+
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def _format_labels(labelnames, values, extra=None):
+    pairs = list(zip(labelnames, values)) + (list(extra.items()) if extra else [])
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+class Counter:
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, value=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # labels -> [conteos por bucket, suma, total]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * len(self.buckets), 0.0, 0]
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labels, (counts, total_sum, count) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, {'le': bound})} {cumulative}")
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, {'le': '+Inf'})} {count}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {round(total_sum, 6)}")
+                lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {count}")
+        return lines
+
+
+class Registry:
+    """Métricas registradas y colectores que calculan gauges al momento de exponerlas."""
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector):
+        """'collector()' retorna una lista de (nombre, descripción, {labels}, valor) como gauges."""
+        self._collectors.append(collector)
+
+    def render(self, extra_samples=()):
+        """Texto de exposición de Prometheus; 'extra_samples' se agregan como gauges."""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        documented = set()
+        for collector in [*self._collectors, lambda: extra_samples]:
+            try:
+                samples = collector()
+            except Exception:
+                continue
+            for name, documentation, labels, value in samples:
+                if name not in documented:
+                    lines += [f"# HELP {name} {documentation}", f"# TYPE {name} gauge"]
+                    documented.add(name)
+                lines.append(f"{name}{_format_labels(tuple(labels), tuple(labels.values()))} {value}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+CHAT_LATENCY = REGISTRY.register(Histogram(
+    "sophia_chat_latency_seconds", "Duración de cada turno de chat", ["endpoint"]))
+CHAT_ERRORS = REGISTRY.register(Counter(
+    "sophia_chat_errors_total", "Turnos de chat que terminaron en error", ["endpoint"]))
+AGENT_ITERATIONS = REGISTRY.register(Histogram(
+    "sophia_agent_iterations", "Acciones (llamadas a herramientas) del agente por turno", [],
+    buckets=(0, 1, 2, 3, 4, 5, 7, 10, 15)))
+LLM_CALLS_PER_TURN = REGISTRY.register(Histogram(
+    "sophia_llm_calls_per_turn", "Llamadas al LLM por turno de chat", [], buckets=(1, 2, 3, 4, 5, 7, 10, 15)))
+LLM_LATENCY = REGISTRY.register(Histogram(
+    "sophia_llm_latency_seconds", "Duración de cada llamada al LLM", ["model"]))
+LLM_TOKENS = REGISTRY.register(Counter(
+    "sophia_llm_tokens_total", "Tokens consumidos por el LLM", ["model", "type"]))
+LLM_ERRORS = REGISTRY.register(Counter(
+    "sophia_llm_errors_total", "Llamadas al LLM que fallaron", ["model"]))
+TOOL_LATENCY = REGISTRY.register(Histogram(
+    "sophia_tool_latency_seconds", "Duración de cada ejecución de herramienta", ["tool"]))
+TOOL_ERRORS = REGISTRY.register(Counter(
+    "sophia_tool_errors_total", "Ejecuciones de herramienta que fallaron o devolvieron error", ["tool"]))
+MEMORY_PROMPT_TOKENS = REGISTRY.register(Histogram(
+    "sophia_memory_prompt_tokens", "Tokens del historial de conversación enviados al prompt por turno", [],
+    buckets=(100, 250, 500, 1000, 1500, 2000, 3000, 4000, 6000, 8000)))
+MERAKI_LATENCY = REGISTRY.register(Histogram(
+    "sophia_meraki_request_latency_seconds", "Duración de cada llamada al SDK de Meraki", ["endpoint"]))
+MERAKI_ERRORS = REGISTRY.register(Counter(
+    "sophia_meraki_request_errors_total", "Llamadas al SDK de Meraki que fallaron", ["endpoint"]))
+
+
+# ------------------------------------------------------------------ trazas por solicitud
+
+_current_trace = contextvars.ContextVar("sophia_trace", default=None)
+
+
+class Trace:
+    """Traza estructurada de una solicitud: tramos de LLM, herramientas y llamadas a Meraki."""
+
+    def __init__(self, endpoint, session_id=None):
+        self.request_id = uuid.uuid4().hex[:12]
+        self.endpoint = endpoint
+        self.session_id = session_id
+        self.started = time.perf_counter()
+        self.spans = []
+        self.fields = {}  # Datos del turno que no son tramos (p. ej. tokens de la memoria)
+        self._lock = threading.Lock()
+        self._token = None
+
+    def add_span(self, kind, name, seconds, error=None, **extra):
+        span = {"kind": kind, "name": name, "ms": round(seconds * 1000, 1), **extra}
+        if error:
+            span["error"] = str(error)[:200]
+        with self._lock:
+            self.spans.append(span)
+
+    def annotate(self, **fields):
+        with self._lock:
+            self.fields.update(fields)
+
+    def __enter__(self):
+        self._token = _current_trace.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _current_trace.reset(self._token)
+        elapsed = time.perf_counter() - self.started
+        CHAT_LATENCY.observe(elapsed, self.endpoint)
+        if exc is not None:
+            CHAT_ERRORS.inc(self.endpoint)
+        trace_logger.info(json.dumps({
+            "request_id": self.request_id,
+            "endpoint": self.endpoint,
+            "session_id": self.session_id,
+            "ms": round(elapsed * 1000, 1),
+            "error": str(exc) if exc else None,
+            **self.fields,
+            "spans": self.spans,
+        }, ensure_ascii=False, default=str))
+        return False
+
+
+def current_trace():
+    return _current_trace.get()
+
+
+def observe_meraki_call(endpoint, seconds, error=None):
+    """Observador de ScheduledDashboard: una llamada real al SDK de Meraki."""
+    MERAKI_LATENCY.observe(seconds, endpoint)
+    if error is not None:
+        MERAKI_ERRORS.inc(endpoint)
+    trace = current_trace()
+    if trace is not None:
+        trace.add_span("meraki", endpoint, seconds, error)
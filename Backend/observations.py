@@ -0,0 +1,88 @@
+import json
+import os
+
+# Límites de lo que una herramienta le devuelve al LLM: filas por tabla y caracteres en total
+OBSERVATION_MAX_ROWS = int(os.getenv("SOPHIA_OBSERVATION_MAX_ROWS", "40"))
+OBSERVATION_MAX_CHARS = int(os.getenv("SOPHIA_OBSERVATION_MAX_CHARS", "6000"))
+
+# Columnas que ve el LLM por herramienta (rutas con punto para campos anidados).
+# Las herramientas que no aparecen aquí muestran todas las columnas de sus filas.
+PROJECTIONS = {
+    "list_organizations": ["id", "name"],
+    "list_networks": ["id", "name", "productTypes"],
+    "list_devices": ["name", "serial", "model", "productType", "lanIp"],
+    "list_firewall_rules": ["policy", "protocol", "srcCidr", "srcPort", "destCidr", "destPort", "comment"],
+    "list_vlans": ["id", "name", "subnet", "applianceIp"],
+    "list_wireless_channels": ["serial", "band", "startTs", "endTs", "utilization.total"],
+}
+
+
+def _get(row, path):
+    for part in path.split("."):
+        row = row.get(part) if isinstance(row, dict) else None
+    return row
+
+
+def _cell(value):
+    if value is None:
+        return ""
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str)
+    return str(value).replace("|", "/").replace("\n", " ")
+
+
+def encode_table(rows, fields=None, max_rows=OBSERVATION_MAX_ROWS):
+    """
+    Codifica una lista de diccionarios como tabla separada por '|': una línea de columnas y
+    una por fila, hasta 'max_rows' filas; las demás se resumen en una línea "... y N más".
+    """
+    if fields is None:
+        fields = list(dict.fromkeys(key for row in rows for key in row))
+    lines = ["|".join(fields)]
+    lines += ["|".join(_cell(_get(row, field)) for field in fields) for row in rows[:max_rows]]
+    if len(rows) > max_rows:
+        lines.append(f"... y {len(rows) - max_rows} más (de {len(rows)}; usa filtros o limit para acotar)")
+    return "\n".join(lines)
+
+
+def _render(value, fields, max_rows):
+    if isinstance(value, list):
+        if value and all(isinstance(item, dict) for item in value):
+            return encode_table(value, fields, max_rows)
+        shown = ", ".join(_cell(item) for item in value[:max_rows])
+        return shown + (f" ... y {len(value) - max_rows} más" if len(value) > max_rows else "")
+    if isinstance(value, dict):
+        parts = []
+        for key, item in value.items():
+            if isinstance(item, (list, dict)) and item:
+                parts.append(f"{key}:\n{_render(item, fields, max_rows)}")
+            else:
+                parts.append(f"{key}: {_cell(item)}")
+        return "\n".join(parts)
+    return str(value)
+
+
+def _cap(text, max_chars):
+    """Recorta el texto en un salto de línea para no pasar de 'max_chars' caracteres."""
+    if len(text) <= max_chars:
+        return text
+    cut = text.rfind("\n", 0, max_chars)
+    cut = cut if cut > 0 else max_chars
+    return text[:cut] + f"\n... (recortado: {len(text) - cut} caracteres más)"
+
+
+def shape_observation(tool_name, result, max_rows=OBSERVATION_MAX_ROWS, max_chars=OBSERVATION_MAX_CHARS):
+    """
+    Convierte el resultado de una herramienta en el texto compacto que ve el LLM: tablas con
+    las columnas de PROJECTIONS, filas acotadas y un tope total de caracteres.
+    Un error ({"error": ...}) se devuelve como "error: ...".
+    """
+    return _cap(_render(result, PROJECTIONS.get(tool_name), max_rows), max_chars)
+
+
+def shaped(tool_name, func):
+    """Envuelve la función de una herramienta para que su resultado pase por shape_observation."""
+    def run(*args, **kwargs):
+        return shape_observation(tool_name, func(*args, **kwargs))
+
+    return run
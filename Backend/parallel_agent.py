@@ -0,0 +1,42 @@
+from langchain.agents import AgentExecutor
+from meraki_concurrency import fan_out
+
+
+class _PendingAction:
+    """Acción del agente cuya ejecución se difiere hasta conocer todas las del paso."""
+
+    def __init__(self, args, kwargs):
+        self.args = args
+        self.kwargs = kwargs
+
+
+class ParallelAgentExecutor(AgentExecutor):
+    """
+    AgentExecutor que ejecuta en paralelo las herramientas pedidas en un mismo paso
+    (p. ej. dispositivos, VLANs y reglas de firewall de una red) y devuelve todas las
+    observaciones juntas al modelo en la siguiente llamada.
+    La ruta asíncrona (ainvoke) de AgentExecutor ya las agrupa con asyncio.gather;
+    esta clase hace lo mismo en la ruta síncrona (invoke) con un pool de hilos acotado.
+    """
+
+    max_parallel_tools: int = 8
+
+    def _perform_agent_action(self, *args, **kwargs):
+        return _PendingAction(args, kwargs)
+
+    def _iter_next_step(self, *args, **kwargs):
+        pending = []
+        for item in super()._iter_next_step(*args, **kwargs):
+            if isinstance(item, _PendingAction):
+                pending.append(item)
+            else:
+                yield item
+        results, errors = fan_out(
+            lambda action: AgentExecutor._perform_agent_action(self, *action.args, **action.kwargs),
+            pending,
+            max_workers=self.max_parallel_tools,
+        )
+        if errors:
+            raise errors[0][1]
+        for _, step in results:
+            yield step
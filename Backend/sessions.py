@@ -0,0 +1,70 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+
+
+class AgentSession:
+    """Agente de una sesión de chat, con su lock, la marca de último uso y los turnos completados."""
+
+    def __init__(self, agent):
+        self.agent = agent
+        self.lock = asyncio.Lock()  # Serializa los turnos de una misma sesión
+        self.last_used = time.monotonic()
+        self.turns = 0
+
+
+class AgentRegistry:
+    """
+    Registro de agentes por session_id. Cada sesión tiene su propia memoria.
+    Las sesiones se desalojan por LRU cuando se supera 'max_sessions' y por
+    inactividad cuando pasan más de 'idle_ttl' segundos sin usarse.
+    Seguro para varios hilos: la API crea las sesiones en el threadpool para que
+    construir un agente no bloquee el event loop.
+    """
+
+    def __init__(self, factory, max_sessions=500, idle_ttl=1800):
+        self.factory = factory
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id):
+        """Devuelve la sesión (creándola si no existe) y la marca como usada."""
+        self.evict_idle()
+        with self._lock:
+            session = self._touch(session_id)
+        if session is not None:
+            return session
+        # El agente se construye fuera del lock: puede tardar (import de Sophia, modelo, memoria)
+        agent = self.factory()
+        with self._lock:
+            if session_id not in self._sessions:  # Otro hilo pudo crearla mientras tanto
+                self._sessions[session_id] = AgentSession(agent)
+                while len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)
+            return self._touch(session_id)
+
+    def _touch(self, session_id):
+        session = self._sessions.get(session_id)
+        if session is not None:
+            self._sessions.move_to_end(session_id)
+            session.last_used = time.monotonic()
+        return session
+
+    def drop(self, session_id):
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def evict_idle(self):
+        now = time.monotonic()
+        with self._lock:
+            idle = [sid for sid, session in self._sessions.items()
+                    if now - session.last_used > self.idle_ttl and not session.lock.locked()]
+            for sid in idle:
+                del self._sessions[sid]
+        return len(idle)
+
+    def __len__(self):
+        return len(self._sessions)
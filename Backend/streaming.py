@@ -0,0 +1,122 @@
+import asyncio
+import json
+import time
+from langchain_core.callbacks import AsyncCallbackHandler
+
+# Prefijo con el que el agente conversacional (ReAct) marca su respuesta final
+FINAL_ANSWER_PREFIX = "AI:"
+
+
+def final_answer_prefix(agent):
+    """Prefijo de la respuesta final según el modo del agente (None: todo el texto es respuesta)."""
+    mode = (getattr(agent, "metadata", None) or {}).get("agent_mode", "react")
+    return FINAL_ANSWER_PREFIX if mode == "react" else None
+
+
+def _requests_tools(response):
+    """True si alguna generación del LLMResult pide llamar herramientas."""
+    for generations in response.generations:
+        for generation in generations:
+            message = getattr(generation, "message", None)
+            if message is not None and (getattr(message, "tool_calls", None)
+                                        or message.additional_kwargs.get("tool_calls")):
+                return True
+    return False
+
+
+class SSECallbackHandler(AsyncCallbackHandler):
+    """
+    Convierte los callbacks del agente en eventos Server-Sent Events:
+    - tool_start / tool_end / tool_error: herramienta invocada y su duración en ms;
+    - token: fragmentos de la respuesta final a medida que el modelo los genera;
+    - done / error: fin del turno.
+    Con 'final_prefix' en None (agente con llamadas a funciones) el texto de cada llamada al
+    modelo se retiene hasta que termina: si la generación pidió herramientas se descarta
+    (el modelo puede acompañar las llamadas con texto) y si no, es la respuesta final.
+    """
+
+    def __init__(self, final_prefix=FINAL_ANSWER_PREFIX):
+        self.final_prefix = final_prefix
+        self.queue = asyncio.Queue()
+        self._tool_started = {}
+        self._text = {}  # run_id -> texto generado antes del prefijo de la respuesta final
+        self._answering = set()  # run_id de las llamadas que ya llegaron a la respuesta final
+        self._pending = {}  # run_id -> tokens retenidos (sin prefijo)
+
+    async def _emit(self, event, data):
+        await self.queue.put((event, data))
+
+    async def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        # Cada llamada al LLM es un paso nuevo del ciclo del agente
+        if self.final_prefix is None:
+            self._pending[run_id] = []
+        else:
+            self._text[run_id] = ""
+
+    async def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        await self.on_llm_start(serialized, [], run_id=run_id, **kwargs)
+
+    async def on_llm_new_token(self, token, *, run_id, **kwargs):
+        if not token:
+            return
+        if self.final_prefix is None:
+            self._pending.setdefault(run_id, []).append(token)
+            return
+        if run_id in self._answering:
+            await self._emit("token", {"text": token})
+            return
+        text = self._text.get(run_id, "") + token
+        self._text[run_id] = text
+        if self.final_prefix in text:
+            self._answering.add(run_id)
+            rest = text.split(self.final_prefix, 1)[1].lstrip()
+            if rest:
+                await self._emit("token", {"text": rest})
+
+    async def on_llm_end(self, response, *, run_id, **kwargs):
+        tokens = self._forget_run(run_id)
+        if tokens and not _requests_tools(response):
+            for token in tokens:
+                await self._emit("token", {"text": token})
+
+    async def on_llm_error(self, error, *, run_id, **kwargs):
+        self._forget_run(run_id)
+
+    def _forget_run(self, run_id):
+        self._text.pop(run_id, None)
+        self._answering.discard(run_id)
+        return self._pending.pop(run_id, None)
+
+    async def on_tool_start(self, serialized, input_str, *, run_id, **kwargs):
+        name = (serialized or {}).get("name")
+        self._tool_started[run_id] = (name, time.perf_counter())
+        await self._emit("tool_start", {"tool": name, "input": input_str})
+
+    async def on_tool_end(self, output, *, run_id, **kwargs):
+        name, elapsed_ms = self._finish_tool(run_id)
+        await self._emit("tool_end", {"tool": name, "elapsed_ms": elapsed_ms})
+
+    async def on_tool_error(self, error, *, run_id, **kwargs):
+        name, elapsed_ms = self._finish_tool(run_id)
+        await self._emit("tool_error", {"tool": name, "error": str(error), "elapsed_ms": elapsed_ms})
+
+    def _finish_tool(self, run_id):
+        name, started = self._tool_started.pop(run_id, (None, None))
+        return name, round((time.perf_counter() - started) * 1000, 1) if started else None
+
+    async def finish(self, output):
+        await self._emit("done", {"response": output})
+        await self.queue.put(None)
+
+    async def fail(self, error):
+        await self._emit("error", {"detail": str(error)})
+        await self.queue.put(None)
+
+    async def events(self):
+        """Generador asíncrono con los eventos ya formateados para text/event-stream."""
+        while True:
+            item = await self.queue.get()
+            if item is None:
+                break
+            event, data = item
+            yield f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
@@ -0,0 +1,34 @@
+import os
+import sys
+import tempfile
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from meraki_stub import StubData, StubServer  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def stub():
+    """Servidor simulado de Meraki para toda la sesión; SOPHIA apunta a él antes de importar meraki_utils."""
+    from benchmark import configure_environment
+    server = StubServer(StubData(networks=2, switches=2, aps=3, cameras=1, clients=200), latency_ms=0).start()
+    configure_environment(server, tempfile.mkdtemp(prefix="sophia-tests-"))
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def agent_factory(stub):
+    """Fábrica de agentes del modo por defecto con el modelo de chat con guion del benchmark."""
+    pytest.importorskip("langchain")
+    import Sophia
+    from benchmark import TOOLS_CHAT_SCRIPT, scripted_llm, scripted_tools_llm
+
+    def factory():
+        memory = Sophia.create_memory(llm=scripted_llm(["Resumen de la conversación."]))
+        return Sophia.create_agent(memory=memory, llm=scripted_tools_llm(TOOLS_CHAT_SCRIPT))
+
+    return factory
@@ -0,0 +1,11 @@
+import pytest
+
+pytest.importorskip("meraki")
+
+
+def test_list_cameras_rejects_an_invalid_network_id(stub):
+    import meraki_utils as mu
+    assert mu.list_cameras({"network_id": "L_0"}) == mu.list_cameras("L_0")
+    assert isinstance(mu.list_cameras("L_0"), list) and mu.list_cameras("L_0")
+    error = mu.list_cameras({"network_id": "oficina"})
+    assert error == {"error": "❌ Error: network_id tiene un formato incorrecto: oficina"}
@@ -0,0 +1,59 @@
+import time
+import pytest
+
+pytest.importorskip("meraki")
+
+from channel_history import ChannelUtilizationStore, _timestamp  # noqa: E402
+
+NETWORK_ID = "L_0"
+
+
+@pytest.fixture
+def mu(stub, tmp_path, monkeypatch):
+    import meraki_utils
+    monkeypatch.setattr(meraki_utils, "channel_store", ChannelUtilizationStore(str(tmp_path / "channels.db")))
+    return meraki_utils
+
+
+def test_first_sync_fetches_each_band_at_the_configured_resolution(mu):
+    samples = mu.list_wireless_channels(NETWORK_ID)
+    assert isinstance(samples, list) and samples
+    assert {sample["band"] for sample in samples} == set(mu.CHANNEL_BANDS)
+    # Mismo formato de fechas que la API
+    assert all(sample["startTs"].endswith("Z") and sample["endTs"].endswith("Z") for sample in samples)
+    durations = {_timestamp(sample["endTs"]) - _timestamp(sample["startTs"]) for sample in samples}
+    assert durations == {mu.CHANNEL_RESOLUTION}
+
+
+def test_sync_backfills_gaps_longer_than_the_window(mu):
+    store = mu.channel_store
+    devices = mu._wireless_devices(NETWORK_ID)
+    gap_start = int(time.time()) - 3 * 86400
+    for device in devices:
+        for band in mu.CHANNEL_BANDS:
+            store.store(NETWORK_ID, device["serial"], band, [], gap_start, since=gap_start)
+
+    mu._sync_channel_history(NETWORK_ID, devices)
+
+    assert store.first_timestamp(NETWORK_ID, gap_start) - gap_start < 3600
+    for device in devices:
+        for band in mu.CHANNEL_BANDS:
+            fetched_until, _ = store.fetch_state(device["serial"], band)
+            assert time.time() - fetched_until < 2 * mu.CHANNEL_RESOLUTION
+    trends = mu.wireless_channel_trends({"network_id": NETWORK_ID, "days": 3})
+    assert trends["data_since_utc"] is not None
+    assert len(trends["worst_aps"]) == len(devices) * len(mu.CHANNEL_BANDS)
+
+
+def test_answers_from_the_series_expire_with_the_next_refresh(mu, monkeypatch):
+    from meraki_cache import record_dependencies
+    with record_dependencies() as dependencies:
+        mu.list_wireless_channels(NETWORK_ID)
+    assert not dependencies.uncacheable
+    assert dependencies.expires_at() <= time.monotonic() + mu.CHANNEL_REFRESH_INTERVAL
+
+    # Una banda que la API rechaza deja la serie incompleta: la respuesta no se cachea
+    monkeypatch.setattr(mu, "CHANNEL_BANDS", ["7"])
+    with record_dependencies() as dependencies:
+        mu.wireless_channel_trends(NETWORK_ID)
+    assert dependencies.uncacheable
@@ -0,0 +1,140 @@
+import asyncio
+import json
+import logging
+import pytest
+
+pytest.importorskip("fastapi")
+httpx = pytest.importorskip("httpx")
+
+QUESTION = "¿Cuál es el estado de la red L_0?"
+ANSWER = "La red L_0 está operativa."
+
+
+@pytest.fixture
+def make_app(agent_factory, monkeypatch):
+    """Aplicación con el agente por defecto, sin enrutador de intenciones ni caché de respuestas."""
+    import app as app_module
+    monkeypatch.setattr(app_module, "SOPHIA_INTENT_ROUTER", "off")
+    monkeypatch.setattr(app_module, "ANSWER_CACHE_TTL", 0)
+
+    def make(**settings):
+        for name, value in settings.items():
+            monkeypatch.setattr(app_module, name, value)
+        return app_module.create_app(agent_factory=agent_factory)
+
+    return make
+
+
+def request(application, method, path, **payload):
+    async def run():
+        transport = httpx.ASGITransport(app=application)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.request(method, path, json=payload or None, timeout=60)
+
+    return asyncio.run(run())
+
+
+def post(application, path, **payload):
+    return request(application, "POST", path, **payload)
+
+
+def sse_events(body):
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_chat_runs_default_agent(make_app):
+    application = make_app()
+    response = post(application, "/chat/", message=QUESTION, session_id="s1")
+    assert response.status_code == 200, response.text
+    assert response.json() == {"response": ANSWER, "session_id": "s1"}
+    assert application.state.sessions.get("s1").agent.metadata["agent_mode"] == "tools"
+
+
+def test_chat_stream_runs_default_agent(make_app):
+    response = post(make_app(), "/chat/stream/", message=QUESTION, session_id="s1")
+    assert response.status_code == 200
+    events = sse_events(response.text)
+    names = [event for event, _ in events]
+    assert names[0] == "tool_start" and events[0][1]["tool"] == "get_network_status"
+    assert "tool_end" in names
+    assert events[-1] == ("done", {"response": ANSWER})
+
+
+def test_answer_cache_only_serves_first_turns(make_app):
+    application = make_app(ANSWER_CACHE_TTL=300)
+    answers = application.state.answers
+    post(application, "/chat/", message=QUESTION, session_id="first")
+    assert answers.stats()["entries"] == 1
+
+    # Primer turno de otra sesión: se responde desde la caché
+    post(application, "/chat/", message=QUESTION, session_id="other")
+    assert answers.stats()["hits"] == 1
+    assert application.state.sessions.get("other").turns == 1
+
+    # En medio de una conversación la pregunta pasa por el agente, con su propio historial
+    post(application, "/chat/", message="Hola", session_id="ongoing")
+    post(application, "/chat/", message=QUESTION, session_id="ongoing")
+    assert answers.stats()["hits"] == 1
+    assert application.state.sessions.get("ongoing").turns == 2
+    history = application.state.sessions.get("ongoing").agent.memory.load_memory_variables({})["chat_history"]
+    assert [m.content for m in history if m.type == "human"] == ["Hola", QUESTION]
+
+
+def test_answer_built_from_a_failed_dashboard_read_is_not_cached(make_app, stub, monkeypatch):
+    from meraki_stub import StubError
+    import meraki_utils as mu
+
+    routes = stub._routes
+
+    def failing_routes():
+        def fail(match, query):
+            raise StubError(400, "Falla simulada")
+        return [(method, pattern, fail if pattern.endswith("/clients/overview") else handler)
+                for method, pattern, handler in routes()]
+
+    monkeypatch.setattr(stub, "_routes", failing_routes)
+    mu.dashboard.invalidate()
+    application = make_app(ANSWER_CACHE_TTL=300)
+    answers = application.state.answers
+    post(application, "/chat/", message=QUESTION, session_id="first")
+    assert answers.stats()["entries"] == 0
+
+    post(application, "/chat/", message=QUESTION, session_id="other")
+    assert answers.stats()["hits"] == 0
+
+
+def metric_value(text, name):
+    return next(float(line.split()[-1]) for line in text.splitlines() if line.startswith(name + " "))
+
+
+def test_memory_prompt_tokens_reach_metrics_and_trace(make_app, monkeypatch):
+    from metrics import trace_logger
+
+    class Records(logging.Handler):
+        def __init__(self):
+            super().__init__()
+            self.lines = []
+
+        def emit(self, record):
+            self.lines.append(json.loads(record.getMessage()))
+
+    records = Records()
+    monkeypatch.setattr(trace_logger, "disabled", False)
+    monkeypatch.setattr(trace_logger, "level", logging.INFO)
+    trace_logger.addHandler(records)
+    try:
+        application = make_app()
+        before = request(application, "GET", "/metrics").text
+        post(application, "/chat/", message=QUESTION, session_id="s1")
+        after = request(application, "GET", "/metrics").text
+    finally:
+        trace_logger.removeHandler(records)
+
+    count = "sophia_memory_prompt_tokens_count"
+    assert metric_value(after, count) == (metric_value(before, count) if count in before else 0) + 1
+    memory = records.lines[-1]["memory"]
+    assert memory["turns"] == 1 and memory["last_prompt_tokens"] > 0
@@ -0,0 +1,94 @@
+import time
+from types import SimpleNamespace
+import pytest
+from meraki_cache import CachedDashboard, record_dependencies
+
+
+def fake_client(calls):
+    def get_network_clients(network_id, **kwargs):
+        calls.append(kwargs)
+        return [{"id": f"{network_id}-{len(calls)}"}]
+
+    return SimpleNamespace(networks=SimpleNamespace(getNetworkClients=get_network_clients))
+
+
+def test_call_uncached_does_not_store_pages():
+    calls = []
+    dashboard = CachedDashboard(fake_client(calls))
+    for _ in range(2):
+        dashboard.call_uncached("networks.getNetworkClients", "L_0", perPage=1000, startingAfter="k1")
+    assert len(calls) == 2
+    assert dashboard.stats()["entries"] == 0
+
+
+def test_call_uncached_bounds_dependent_answers_by_the_endpoint_ttl():
+    dashboard = CachedDashboard(fake_client([]), ttls={"networks.getNetworkClients": 0.05})
+    with record_dependencies() as dependencies:
+        dashboard.call_uncached("networks.getNetworkClients", "L_0")
+    assert not dependencies.uncacheable
+    assert dependencies.is_current()
+    assert dependencies.expires_at() <= time.monotonic() + 0.05
+    time.sleep(0.06)
+    assert not dependencies.is_current()
+
+
+def test_call_uncached_without_ttl_is_uncacheable():
+    dashboard = CachedDashboard(fake_client([]), ttls={})
+    with record_dependencies() as dependencies:
+        dashboard.call_uncached("networks.getNetworkClients", "L_0")
+    assert dependencies.uncacheable
+
+
+def test_failed_reads_are_uncacheable():
+    def fail(network_id, **kwargs):
+        raise RuntimeError("500 Internal Server Error")
+
+    client = SimpleNamespace(networks=SimpleNamespace(getNetworkDevices=fail, getNetworkClients=fail))
+    dashboard = CachedDashboard(client)
+    for read in (lambda: dashboard.networks.getNetworkDevices("L_0"),
+                 lambda: dashboard.call_uncached("networks.getNetworkClients", "L_0")):
+        with record_dependencies() as dependencies:
+            with pytest.raises(RuntimeError):
+                read()
+        assert dependencies.uncacheable
+    assert dashboard.stats()["entries"] == 0
+
+
+def test_iter_clients_streams_pages_without_caching_them(stub):
+    pytest.importorskip("meraki")
+    import meraki_utils as mu
+    mu.dashboard.invalidate()
+    clients = list(mu.iter_clients("L_0", per_page=50))
+    assert len(clients) == len(stub.data.clients["L_0"])
+    assert mu.dashboard.invalidate("networks.getNetworkClients") == 0
+
+
+def test_inventory_reads_expire_with_the_next_sync(stub, tmp_path, monkeypatch):
+    pytest.importorskip("meraki")
+    import meraki_utils as mu
+    from inventory import InventoryIndex
+    index = InventoryIndex(str(tmp_path / "inventory.db"))
+    monkeypatch.setattr(mu, "inventory", index)
+    monkeypatch.setattr(mu, "INVENTORY_SYNC_INTERVAL", 60)
+    monkeypatch.setattr(mu, "INVENTORY_MAX_AGE", 120)
+
+    with record_dependencies() as dependencies:
+        mu.find_devices("AP")
+    assert dependencies.uncacheable  # Índice todavía sin sincronizar
+
+    index.store_organizations([{"id": "1", "name": "Org"}])
+    with record_dependencies() as dependencies:
+        assert mu.list_organizations() == [{"id": "1", "name": "Org"}]
+    assert not dependencies.uncacheable
+    assert dependencies.expires_at() <= time.monotonic() + 60
+
+
+def test_resolve_org_falls_back_to_the_cached_network(stub, tmp_path, monkeypatch):
+    pytest.importorskip("meraki")
+    import meraki_utils as mu
+    from inventory import InventoryIndex
+    monkeypatch.setattr(mu, "inventory", InventoryIndex(str(tmp_path / "inventory.db")))
+    org_id = stub.data.org["id"]
+    assert mu._resolve_org("getNetworkDevices", ("L_0",), {}) == org_id
+    assert mu._resolve_org("getNetworkClients", ("L_0",), {}) == org_id
+    assert mu.dashboard.invalidate("networks.getNetwork", "L_0") == 1  # Una sola lectura, cacheada
@@ -0,0 +1,50 @@
+import asyncio
+import time
+import pytest
+
+pytest.importorskip("fastapi")
+httpx = pytest.importorskip("httpx")
+
+
+class EchoAgent:
+    async def ainvoke(self, inputs, config=None):
+        return {"output": inputs["input"]}
+
+
+def slow_factory():
+    time.sleep(0.5)  # Como el primer import de Sophia o la creación del agente
+    return EchoAgent()
+
+
+def test_new_session_does_not_block_the_event_loop(monkeypatch):
+    import app as app_module
+    monkeypatch.setattr(app_module, "SOPHIA_INTENT_ROUTER", "off")
+    application = app_module.create_app(agent_factory=slow_factory)
+
+    async def run():
+        transport = httpx.ASGITransport(app=application)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            async def root():
+                started = time.perf_counter()
+                await asyncio.sleep(0.05)  # Llega mientras se crea la sesión nueva
+                await client.get("/")
+                return time.perf_counter() - started
+
+            root_seconds, chat = await asyncio.gather(
+                root(), client.post("/chat/", json={"message": "hola", "session_id": "nueva"}))
+            return chat, root_seconds
+
+    chat, root_seconds = asyncio.run(run())
+    assert chat.json()["response"] == "hola"
+    assert root_seconds < 0.3
+
+
+def test_concurrent_first_requests_share_one_session():
+    from concurrent.futures import ThreadPoolExecutor
+    from sessions import AgentRegistry
+
+    sessions = AgentRegistry(slow_factory)
+    with ThreadPoolExecutor(4) as pool:
+        created = list(pool.map(sessions.get, ["s"] * 4))
+    assert len(sessions) == 1
+    assert all(session is created[0] for session in created)
@@ -0,0 +1,41 @@
+import asyncio
+import uuid
+import pytest
+
+pytest.importorskip("langchain_core")
+
+from langchain_core.messages import AIMessage  # noqa: E402
+from langchain_core.outputs import ChatGeneration, LLMResult  # noqa: E402
+from streaming import SSECallbackHandler  # noqa: E402
+
+
+def run_step(handler, tokens, message):
+    async def run():
+        run_id = uuid.uuid4()
+        await handler.on_chat_model_start({}, [], run_id=run_id)
+        for token in tokens:
+            await handler.on_llm_new_token(token, run_id=run_id)
+        await handler.on_llm_end(LLMResult(generations=[[ChatGeneration(message=message)]]), run_id=run_id)
+
+    asyncio.run(run())
+
+
+def streamed_text(handler):
+    events = []
+    while not handler.queue.empty():
+        events.append(handler.queue.get_nowait())
+    return "".join(data["text"] for event, data in events if event == "token")
+
+
+def test_tools_mode_streams_only_the_final_answer():
+    handler = SSECallbackHandler(final_prefix=None)
+    tool_call = {"name": "get_network_status", "args": {"network_id": "L_0"}, "id": "call_0"}
+    run_step(handler, ["Reviso ", "la red."], AIMessage(content="Reviso la red.", tool_calls=[tool_call]))
+    run_step(handler, ["La red ", "está operativa."], AIMessage(content="La red está operativa."))
+    assert streamed_text(handler) == "La red está operativa."
+
+
+def test_react_mode_streams_after_the_prefix():
+    handler = SSECallbackHandler()
+    run_step(handler, ["Thought: listo\n", "AI: Hola", " mundo"], AIMessage(content=""))
+    assert streamed_text(handler) == "Hola mundo"
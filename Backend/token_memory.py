@@ -0,0 +1,98 @@
+from typing import Any, Dict
+from langchain.memory import ConversationSummaryBufferMemory
+from langchain.schema import SystemMessage, get_buffer_string
+from langchain_core.runnables.config import run_in_executor
+
+
+class TokenBudgetMemory(ConversationSummaryBufferMemory):
+    """
+    Memoria de conversación con presupuesto de tokens:
+    - el prompt del sistema queda fijo al inicio y nunca se resume ni se descarta;
+    - se conservan textualmente solo los últimos 'window_turns' turnos y como máximo
+      'max_token_limit' tokens; lo anterior se resume de forma incremental;
+    - los mensajes muy largos (p. ej. respuestas con JSON crudo de Meraki) se recortan
+      a 'max_message_tokens' antes de guardarse;
+    - registra los tokens del historial enviado al prompt en cada turno.
+    Las variantes asíncronas (ainvoke en la API) aplican las mismas reglas en un hilo,
+    porque resumir llama al LLM de forma síncrona.
+    """
+
+    system_prompt: str = ""
+    window_turns: int = 6
+    max_message_tokens: int = 500
+    turns: int = 0
+    last_prompt_tokens: int = 0
+    total_prompt_tokens: int = 0
+    max_prompt_tokens: int = 0
+
+    def _truncate(self, text):
+        # Aproximación de ~4 caracteres por token para no tokenizar textos enormes
+        max_chars = self.max_message_tokens * 4
+        text = str(text)
+        if len(text) <= max_chars:
+            return text
+        return f"{text[:max_chars]}… [recortado, {len(text) - max_chars} caracteres omitidos]"
+
+    def save_context(self, inputs: Dict[str, Any], outputs: Dict[str, str]) -> None:
+        input_str, output_str = self._get_input_output(inputs, outputs)
+        self.chat_memory.add_user_message(self._truncate(input_str))
+        self.chat_memory.add_ai_message(self._truncate(output_str))
+        self.prune()
+
+    def prune(self) -> None:
+        """Mueve al resumen los mensajes que exceden la ventana o el presupuesto de tokens."""
+        buffer = self.chat_memory.messages
+        max_messages = self.window_turns * 2
+        pruned = []
+        while buffer and (
+            len(buffer) > max_messages
+            or self.llm.get_num_tokens_from_messages(buffer) > self.max_token_limit
+        ):
+            pruned.append(buffer.pop(0))
+        if pruned:
+            self.moving_summary_buffer = self.predict_new_summary(pruned, self.moving_summary_buffer)
+
+    def load_memory_variables(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        messages = []
+        if self.system_prompt:
+            messages.append(SystemMessage(content=self.system_prompt))
+        if self.moving_summary_buffer:
+            messages.append(SystemMessage(
+                content=f"Resumen de la conversación anterior: {self.moving_summary_buffer}"
+            ))
+        messages.extend(self.chat_memory.messages)
+
+        tokens = self.llm.get_num_tokens_from_messages(messages)
+        self.turns += 1
+        self.last_prompt_tokens = tokens
+        self.total_prompt_tokens += tokens
+        self.max_prompt_tokens = max(self.max_prompt_tokens, tokens)
+
+        if self.return_messages:
+            return {self.memory_key: messages}
+        return {self.memory_key: get_buffer_string(
+            messages, human_prefix=self.human_prefix, ai_prefix=self.ai_prefix
+        )}
+
+    def clear(self) -> None:
+        super().clear()
+        self.turns = self.last_prompt_tokens = self.total_prompt_tokens = self.max_prompt_tokens = 0
+
+    async def aload_memory_variables(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        return await run_in_executor(None, self.load_memory_variables, inputs)
+
+    async def asave_context(self, inputs: Dict[str, Any], outputs: Dict[str, str]) -> None:
+        await run_in_executor(None, self.save_context, inputs, outputs)
+
+    async def aclear(self) -> None:
+        await run_in_executor(None, self.clear)
+
+    def metrics(self):
+        """Tokens de historial por turno (último, promedio y máximo)."""
+        return {
+            "turns": self.turns,
+            "last_prompt_tokens": self.last_prompt_tokens,
+            "avg_prompt_tokens": round(self.total_prompt_tokens / self.turns, 1) if self.turns else 0,
+            "max_prompt_tokens": self.max_prompt_tokens,
+            "summarized": bool(self.moving_summary_buffer),
+        }